@@ -0,0 +1,99 @@
+import unittest
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+
+@dataclass
+class Automaton[T]:
+    # Aho-Corasick automaton compiled to a full transition table, one dict lookup per character
+    patterns: dict[str, T]
+    transitions: list[dict[str, int]] = field(init=False, default_factory=list)
+    matches: list[Optional[tuple[int, T]]] = field(init=False, default_factory=list)
+    max_length: int = field(init=False, default=0)
+
+    def __post_init__(self):
+        goto: list[dict[str, int]] = [{}]
+        self.matches = [None]
+        for pattern, value in self.patterns.items():
+            if len(pattern) == 0:
+                raise ValueError("Patterns must not be empty")
+            state = 0
+            for ch in pattern:
+                if ch not in goto[state]:
+                    goto.append({})
+                    self.matches.append(None)
+                    goto[state][ch] = len(goto) - 1
+                state = goto[state][ch]
+            self.matches[state] = (len(pattern), value)
+            self.max_length = max(self.max_length, len(pattern))
+
+        # breadth first, so the fallback state of every state is complete before it is used
+        alphabet = {ch for pattern in self.patterns for ch in pattern}
+        fail = [0] * len(goto)
+        self.transitions = [dict() for _ in goto]
+        self.transitions[0] = {ch: goto[0].get(ch, 0) for ch in alphabet}
+        queue = list(goto[0].values())
+        inx = 0
+        while inx < len(queue):
+            state = queue[inx]
+            inx += 1
+            fallback = self.transitions[fail[state]]
+            self.transitions[state] = {ch: goto[state].get(ch, fallback[ch]) for ch in alphabet}
+            for ch, child in goto[state].items():
+                fail[child] = fallback[ch]
+                queue.append(child)
+            # a state's own pattern is the longest one ending here, otherwise inherit the fallback's
+            if self.matches[state] is None:
+                self.matches[state] = self.matches[fail[state]]
+
+    def first(self, text: Iterable[str]) -> Optional[T]:
+        # value of the match starting earliest; a later ending match can still start earlier, up to max_length - 1 characters on
+        best_start, best_value = None, None
+        state = 0
+        transitions, matches = self.transitions, self.matches
+        for inx, ch in enumerate(text):
+            state = transitions[state].get(ch, 0)
+            if (match := matches[state]) is not None:
+                start = inx - match[0] + 1
+                if best_start is None or start < best_start:
+                    best_start, best_value = start, match[1]
+            if best_start is not None and inx - self.max_length + 1 >= best_start:
+                break
+        return best_value
+
+
+@dataclass
+class WordMatcher[T]:
+    words: dict[str, T]
+    forward: Automaton[T] = field(init=False)
+    backward: Automaton[T] = field(init=False)
+
+    def __post_init__(self):
+        self.forward = Automaton(self.words)
+        self.backward = Automaton({word[::-1]: value for word, value in self.words.items()})
+
+    def first(self, line: str) -> Optional[T]:
+        return self.forward.first(line)
+
+    def last(self, line: str) -> Optional[T]:
+        return self.backward.first(reversed(line))
+
+
+class AutomatonTestCase(unittest.TestCase):
+    def test_first_starting_match_wins(self):
+        automaton = Automaton({'abcd': 1, 'bc': 2, 'x': 3})
+        self.assertEqual(1, automaton.first('zabcd'))
+        self.assertEqual(2, automaton.first('zabce'))
+        self.assertEqual(3, automaton.first('xabcd'))
+        self.assertIsNone(automaton.first('zzz'))
+
+    def test_word_matcher(self):
+        matcher = WordMatcher({'eins': 1, 'zwei': 2, 'drei': 3, 'sieben': 7, '1': 1, '7': 7})
+        self.assertEqual(2, matcher.first('abzweiundsieben'))
+        self.assertEqual(7, matcher.last('abzweiundsieben'))
+        self.assertEqual(3, matcher.first('xdreinsy'))
+        self.assertEqual(1, matcher.last('xdreinsy'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,10 @@
 import unittest
 from typing import Sequence
 
-from Day1.utils import load_file
+from utils import load_file, load_file_bytes
+from utils.parallel import map_reduce_lines
+
+NOT_DIGITS = bytes(ch for ch in range(0, 256) if not (ord('0') <= ch <= ord('9') or ch == ord('\n')))
 
 
 def extract_digits(line: str) -> Sequence[int]:
@@ -11,14 +14,34 @@ def extract_digits(line: str) -> Sequence[int]:
             yield int(ch)
 
 
+def calibration_value(line: str) -> int:
+    digits = list(extract_digits(line))
+    return digits[0]*10 + digits[-1]
+
+
 def task1(input: str) -> int:
     sum = 0
     for line in input.splitlines():
-        digits = list(extract_digits(line))
-        sum += digits[0]*10 + digits[-1]
+        sum += calibration_value(line)
     return sum
 
 
+def task1_vectorized(input: bytes) -> int:
+    # whole-file passes: drop everything but digits and newlines, gather first and last digit per line, sum each group
+    lines = input.translate(None, NOT_DIGITS).split()
+    # split() drops lines left empty, so a line without any digit would otherwise vanish from the sum
+    source_lines = input.splitlines()
+    if len(source_lines) - source_lines.count(b'') != len(lines):
+        raise ValueError("Every non-empty line needs at least one digit")
+    firsts = bytes([line[0] for line in lines])
+    lasts = bytes([line[-1] for line in lines])
+    return (sum(firsts) - ord('0') * len(firsts)) * 10 + sum(lasts) - ord('0') * len(lasts)
+
+
+def task1_stream(path: str, chunk_size: int = 2**20, workers: int = 1) -> int:
+    return map_reduce_lines(path, calibration_value, workers=workers, chunk_size=chunk_size)
+
+
 class Task1TestCase(unittest.TestCase):
     def test_extract_digits(self):
         cases = {
@@ -41,6 +64,17 @@ class Task1TestCase(unittest.TestCase):
         output = task1(data)
         self.assertEqual(54159, output)
 
+    def test_vectorized(self):
+        self.assertEqual(142, task1_vectorized(load_file_bytes('task1_testinput.txt')))
+        self.assertEqual(54159, task1_vectorized(load_file_bytes('task1_input.txt')))
+        self.assertEqual(12 + 33, task1_vectorized(b"a1b2\n\nc3\n"))
+        with self.assertRaises(ValueError):
+            task1_vectorized(b"a1b2\nnodigits\nc3\n")
+
+    def test_challenge_stream(self):
+        self.assertEqual(54159, task1_stream("task1_input.txt", chunk_size=7))
+        self.assertEqual(54159, task1_stream("task1_input.txt", workers=3))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
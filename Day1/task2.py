@@ -1,7 +1,9 @@
 import unittest
 from typing import Sequence
 
-from Day1.utils import load_file
+from Day1.automaton import WordMatcher
+from utils import load_file
+from utils.parallel import map_reduce_lines
 
 VALID_DIGITS = {
     '1': 1,
@@ -25,33 +27,32 @@ VALID_DIGITS = {
 }
 
 
-def extract_first_digit(line: str) -> int:
-    inx = 0
-    while inx < len(line):
-        for key in VALID_DIGITS:
-            if line.startswith(key, inx):
-                return VALID_DIGITS[key]
-        else:
-            inx += 1
+DIGIT_MATCHER = WordMatcher(VALID_DIGITS)
 
 
-def extract_last_digit(line: str) -> int:
-    inx = len(line)
-    while inx > 0:
-        for key in VALID_DIGITS:
-            if line.endswith(key, inx - len(key), inx):
-                return VALID_DIGITS[key]
-        else:
-            inx -= 1
+def extract_first_digit(line: str, matcher: WordMatcher[int] = DIGIT_MATCHER) -> int:
+    return matcher.first(line)
+
+
+def extract_last_digit(line: str, matcher: WordMatcher[int] = DIGIT_MATCHER) -> int:
+    return matcher.last(line)
+
+
+def calibration_value(line: str) -> int:
+    return extract_first_digit(line) * 10 + extract_last_digit(line)
 
 
 def task2(input: str) -> int:
     sum = 0
     for line in input.splitlines():
-        sum += extract_first_digit(line) * 10 + extract_last_digit(line)
+        sum += calibration_value(line)
     return sum
 
 
+def task2_stream(path: str, chunk_size: int = 2**20, workers: int = 1) -> int:
+    return map_reduce_lines(path, calibration_value, workers=workers, chunk_size=chunk_size)
+
+
 class Task2TestCase(unittest.TestCase):
     def test_extract_first_digit(self):
         cases = {
@@ -80,6 +81,10 @@ class Task2TestCase(unittest.TestCase):
         output = task2(input)
         self.assertEqual(expected, output)
 
+    def test_example_stream(self):
+        self.assertEqual(281, task2_stream('task2_testinput.txt', chunk_size=5))
+        self.assertEqual(281, task2_stream('task2_testinput.txt', workers=2))
+
     def test_challenge(self):
         data = load_file("task2_input.txt")
         output = task2(data)
@@ -3,7 +3,8 @@ from dataclasses import dataclass, field
 from enum import IntEnum
 from typing import Sequence, Self, List, Optional, Tuple
 
-from utils import load_file
+from utils import load_file, Vector
+from utils.grid import ByteGrid
 
 
 class Direction(IntEnum):
@@ -114,60 +115,52 @@ class Field(IntEnum):
                 return Direction.NONE
 
 
-@dataclass(eq=True, frozen=True)
-class Position:
-    x: int
-    y: int
-
-    def next(self, direction: Direction) -> Self:
-        match direction:
-            case Direction.NORTH:
-                return Position(self.x, self.y - 1)
-            case Direction.SOUTH:
-                return Position(self.x, self.y + 1)
-            case Direction.WEST:
-                return Position(self.x - 1, self.y)
-            case Direction.EAST:
-                return Position(self.x + 1, self.y)
+# x, y steps of every direction
+OFFSETS = {
+    Direction.NORTH: (0, -1),
+    Direction.SOUTH: (0, 1),
+    Direction.WEST: (-1, 0),
+    Direction.EAST: (1, 0),
+}
 
 
 @dataclass
 class Step:
-    position: Position
+    position: Vector
     direction: Direction
     distance: int
 
 
+FIELDS = tuple(Field)
+# symbol byte to Field value, anything unknown is ground
+SYMBOL_TABLE = bytes(Field.from_symbol(chr(it)) or Field.GROUND for it in range(0, 256))
+
+
 @dataclass
 class Map:
-    fields: list[list[Field]]
+    cells: ByteGrid
     width: int = field(init=False)
     height: int = field(init=False)
 
     def __post_init__(self):
-        self.height = len(self.fields)
-        self.width = len(self.fields[0] if self.height > 0 else 0)
+        self.height = self.cells.height
+        self.width = self.cells.width
 
     @classmethod
     def parse(cls, input: str) -> Self:
-        lines = input.splitlines()
+        return cls(ByteGrid.from_text(input).translated(SYMBOL_TABLE, Field.GROUND))
 
-        return cls(
-            [[Field.from_symbol(symbol) for symbol in line] for line in lines]
-        )
+    def contains(self, position: Vector) -> bool:
+        return 0 <= position.x < self.width and 0 <= position.y < self.height
 
-    def get(self, position: Position) -> Field:
-        if 0 <= position.x < self.width and 0 <= position.y < self.height:
-            return self.fields[position.y][position.x]
-        return Field.GROUND
+    def get(self, position: Vector) -> Field:
+        return FIELDS[self.cells.get(position.x, position.y)]
 
-    def find_start(self) -> Position:
-        for iy in range(0, len(self.fields)):
-            for ix in range(0, len(self.fields[iy])):
-                position = Position(ix, iy)
-                if self.get(position) == Field.START:
-                    return position
-        raise "Erghhh"
+    def find_start(self) -> Vector:
+        inx = self.cells.data.find(Field.START)
+        if inx == -1:
+            raise ValueError("The map has no start field")
+        return Vector(inx % self.width, inx // self.width)
 
 
 def task1(input: str) -> int:
@@ -176,19 +169,21 @@ def task1(input: str) -> int:
     steps = [
         Step(start_position, direction, 0) for direction in [Direction.NORTH, Direction.WEST, Direction.SOUTH, Direction.EAST]
     ]
-    visited: set[Position] = set()
+    visited: set[int] = set()
     while len(steps) > 0:
         next_steps = []
         for step in steps:
-            next_position = step.position.next(step.direction)
-            if next_position in visited:
+            next_position = step.position.step(*OFFSETS[step.direction])
+            # out of bounds positions must not alias a packed cell of the neighbouring row
+            next_index = next_position.pack(map.width) if map.contains(next_position) else -1
+            if next_index in visited:
                 return step.distance + 1
             field = map.get(next_position)
             next_direction = field.next(step.direction)
             if next_direction == Direction.NONE:
                 continue
             next_steps.append(Step(next_position, next_direction, step.distance + 1))
-            visited.add(next_position)
+            visited.add(next_index)
         steps = next_steps
     return 0
 
@@ -199,12 +194,12 @@ def task2(input: str) -> int:
     steps = [
         Step(start_position, direction, 0) for direction in [Direction.NORTH, Direction.WEST, Direction.SOUTH, Direction.EAST]
     ]
-    direction_map = [[Direction.NONE for _ in range(0, map.width)] for _ in range(0, map.height)]
+    direction_map = ByteGrid.filled(map.width, map.height, Direction.NONE)
     loop_completed = False
     while loop_completed is False:
         for step in steps:
-            direction_map[step.position.y][step.position.x] = step.direction
-            next_position = step.position.next(step.direction)
+            direction_map.set(step.position.x, step.position.y, step.direction)
+            next_position = step.position.step(*OFFSETS[step.direction])
             if next_position == start_position:
                 loop_completed = True
                 break
@@ -225,7 +220,7 @@ def task2(input: str) -> int:
         accum = 0
         ix = 0
         while ix < map.width:
-            direction = direction_map[iy][ix]
+            direction = direction_map.get(ix, iy)
             if direction == Direction.NONE:
                 # no change of situation
                 if inside:
@@ -236,7 +231,7 @@ def task2(input: str) -> int:
                 # begin of pipe -> find end and flip state
                 while ix < map.width - 1:
                     ix += 1
-                    next_direction = direction_map[iy][ix]
+                    next_direction = direction_map.get(ix, iy)
                     if next_direction in [Direction.WEST, Direction.EAST]:
                         continue
                     if inside:
@@ -252,10 +247,10 @@ class InputTestCase(unittest.TestCase):
     def test_parse(self):
         input = load_file('task1_example.txt')
         map = Map.parse(input)
-        self.assertEqual(Field.WEST_EAST, map.get(Position(0, 0)))
-        self.assertEqual(Field.START, map.get(Position(1, 1)))
-        self.assertEqual(Field.NORTH_EAST, map.get(Position(0, 2)))
-        self.assertEqual(Field.NORTH_EAST, map.get(Position(0, 2)))
+        self.assertEqual(Field.WEST_EAST, map.get(Vector(0, 0)))
+        self.assertEqual(Field.START, map.get(Vector(1, 1)))
+        self.assertEqual(Field.NORTH_EAST, map.get(Vector(0, 2)))
+        self.assertEqual(Field.NORTH_EAST, map.get(Vector(0, 2)))
 
 
 class Task1TestCase(unittest.TestCase):
@@ -3,18 +3,12 @@ from dataclasses import dataclass, field
 from typing import Sequence, Self, List
 
 
-from utils import load_file
-
-
-@dataclass(eq=True, frozen=True)
-class Position:
-    x: int
-    y: int
+from utils import load_file, Vector, VectorArray
 
 
 @dataclass
 class Sky:
-    galaxies: list[Position]
+    galaxies: VectorArray
     width: int
     height: int
 
@@ -24,12 +18,13 @@ class Sky:
         height = len(lines)
         width = len(lines[0])
 
-        galaxies = []
+        galaxies = VectorArray()
         for iy in range(0, height):
             line = lines[iy]
-            for ix in range(0, width):
-                if line[ix] == '#':
-                    galaxies.append(Position(ix, iy))
+            ix = -1
+            while (ix := line.find('#', ix + 1)) != -1:
+                galaxies.xs.append(ix)
+                galaxies.ys.append(iy)
 
         return cls(
             galaxies,
@@ -52,34 +47,37 @@ class Sky:
         column_adjust = calculate_adjusts(self.empty_columns(), self.width)
         row_adjust = calculate_adjusts(self.empty_rows(), self.height)
         return Sky(
-            [Position(it.x + column_adjust[it.x], it.y + row_adjust[it.y]) for it in self.galaxies],
+            VectorArray.from_columns(
+                [x + column_adjust[x] for x in self.galaxies.xs],
+                [y + row_adjust[y] for y in self.galaxies.ys]
+            ),
             self.width + column_adjust[-1],
             self.height + row_adjust[-1],
         )
 
     def empty_columns(self) -> list[int]:
-        taken : set[int] = set()
-        for galaxy in self.galaxies:
-            taken.add(galaxy.x)
+        taken : set[int] = set(self.galaxies.xs)
         return [i for i in range(0, self.width) if i not in taken]
 
     def empty_rows(self) -> list[int]:
-        taken : set[int] = set()
-        for galaxy in self.galaxies:
-            taken.add(galaxy.y)
+        taken : set[int] = set(self.galaxies.ys)
         return [i for i in range(0, self.height) if i not in taken]
 
 
-def task(input: str, factor: int) -> int:
+def pairwise_distance(values: Sequence[int]) -> int:
+    # sum of |a - b| over all pairs: in sorted order every value is larger than all values before it
     ret = 0
+    accum = 0
+    for i, value in enumerate(sorted(values)):
+        ret += value * i - accum
+        accum += value
+    return ret
+
+
+def task(input: str, factor: int) -> int:
     sky = Sky.parse(input)
     adjusted_sky = sky.gravity_adjusted(factor)
-    for i in range(0, len(adjusted_sky.galaxies) - 1):
-        for j in range(i+1, len(adjusted_sky.galaxies)):
-            first = adjusted_sky.galaxies[i]
-            second = adjusted_sky.galaxies[j]
-            ret += abs(first.x - second.x) + abs(first.y - second.y)
-    return ret
+    return pairwise_distance(adjusted_sky.galaxies.xs) + pairwise_distance(adjusted_sky.galaxies.ys)
 
 
 class InputTestCase(unittest.TestCase):
@@ -104,18 +102,18 @@ class InputTestCase(unittest.TestCase):
     def test_gravity_adjusted_factor1(self):
         sky = self.load()
         adjusted_sky = sky.gravity_adjusted(2)
-        self.assertEqual(sky.galaxies[0], Position(3, 0))
-        self.assertEqual(sky.galaxies[3], Position(6, 4))
-        self.assertEqual(adjusted_sky.galaxies[0], Position(4, 0))
-        self.assertEqual(adjusted_sky.galaxies[3], Position(8, 5))
+        self.assertEqual(sky.galaxies[0], Vector(3, 0))
+        self.assertEqual(sky.galaxies[3], Vector(6, 4))
+        self.assertEqual(adjusted_sky.galaxies[0], Vector(4, 0))
+        self.assertEqual(adjusted_sky.galaxies[3], Vector(8, 5))
 
     def test_gravity_adjusted_factor10(self):
         sky = self.load()
         adjusted_sky = sky.gravity_adjusted(10)
-        self.assertEqual(sky.galaxies[0], Position(3, 0))
-        self.assertEqual(sky.galaxies[3], Position(6, 4))
-        self.assertEqual(adjusted_sky.galaxies[0], Position(12, 0))
-        self.assertEqual(adjusted_sky.galaxies[3], Position(24, 13))
+        self.assertEqual(sky.galaxies[0], Vector(3, 0))
+        self.assertEqual(sky.galaxies[3], Vector(6, 4))
+        self.assertEqual(adjusted_sky.galaxies[0], Vector(12, 0))
+        self.assertEqual(adjusted_sky.galaxies[3], Vector(24, 13))
 
 
 class TaskTestCase(unittest.TestCase):
@@ -3,7 +3,9 @@ from dataclasses import dataclass, field
 from enum import StrEnum
 from typing import Sequence, Self, List, Iterator, Optional, Callable
 
-from utils import load_file, load_file_lines
+from utils import load_file, load_file_lines, Vector
+from utils.cache import load_cached, temporary_cache
+from utils.grid import ByteGrid
 
 
 class Field(StrEnum):
@@ -14,21 +16,15 @@ class Field(StrEnum):
         return self.value
 
 
-@dataclass(eq=True, frozen=True)
-class Position:
-    x: int
-    y: int
-
-
 @dataclass
 class Pattern:
-    fields: list[list[Field]]
+    cells: ByteGrid
     width: int = field(init=False)
     height: int = field(init=False)
 
     def __post_init__(self):
-        self.height = len(self.fields)
-        self.width = len(self.fields[0] if self.height > 0 else 0)
+        self.height = self.cells.height
+        self.width = self.cells.width
 
     @classmethod
     def parse(cls, lines: Iterator[str]) -> Optional[Self]:
@@ -42,9 +38,10 @@ class Pattern:
         if len(consumed) == 0:
             return None
 
-        return cls(
-            [[Field(symbol) for symbol in line] for line in consumed]
-        )
+        cells = ByteGrid.from_text('\n'.join(consumed))
+        if len(cells.data.translate(None, ''.join(Field).encode())) > 0:
+            raise ValueError(f"Unexpected symbol in pattern {consumed}")
+        return cls(cells)
 
     @classmethod
     def parse_multiple(cls, lines: Iterator[str]) -> list[Self]:
@@ -53,18 +50,18 @@ class Pattern:
             ret.append(pattern)
         return ret
 
-    def get(self, position: Position) -> str:
+    def get(self, position: Vector) -> Field:
         if 0 <= position.x < self.width and 0 <= position.y < self.height:
-            return self.fields[position.y][position.x]
+            return Field(chr(self.cells.get(position.x, position.y)))
         raise IndexError(f"The provided {position} is outside of the map bounds (width: {self.width}, height: {self.height})")
 
     def find_vertical_reflection(self, target_errors: int) -> Optional[int]:
-        return self._find_reflection(self.width, self.height, lambda primary, secondary: Position(primary, secondary), target_errors)
+        return self._find_reflection(self.width, self.height, lambda primary, secondary: Vector(primary, secondary), target_errors)
 
     def find_horizontal_reflection(self, target_errors: int) -> Optional[int]:
-        return self._find_reflection(self.height, self.width, lambda primary, secondary: Position(secondary, primary), target_errors)
+        return self._find_reflection(self.height, self.width, lambda primary, secondary: Vector(secondary, primary), target_errors)
 
-    def _find_reflection(self, primary_dimension: int, secondary_dimension: int, accessor: Callable[[int, int], Position], target_errors: int) -> Optional[int]:
+    def _find_reflection(self, primary_dimension: int, secondary_dimension: int, accessor: Callable[[int, int], Vector], target_errors: int) -> Optional[int]:
         candidates = {i: 0 for i in range(0, primary_dimension-1)}
         for secondary in range(0, secondary_dimension):
             for primary, value in candidates.items():
@@ -74,7 +71,7 @@ class Pattern:
                 for i in range(0, count):
                     near = accessor(primary - i, secondary)
                     far = accessor(primary + i + 1, secondary)
-                    if self.get(near) != self.get(far):
+                    if self.cells[near] != self.cells[far]:
                         value += 1
                 candidates[primary] = value
         for primary, value in candidates.items():
@@ -84,9 +81,16 @@ class Pattern:
             return None
 
 
-def task1(input: Iterator[str]) -> int:
+def parse_file(input: str) -> list[Pattern]:
+    return Pattern.parse_multiple(load_file_lines(input))
+
+
+def load(input: str) -> list[Pattern]:
+    return load_cached(input, parse_file)
+
+
+def task1(patterns: list[Pattern]) -> int:
     ret = 0
-    patterns = Pattern.parse_multiple(input)
     for pattern in patterns:
         if (vertical := pattern.find_vertical_reflection(0)) is not None:
             ret += vertical + 1
@@ -95,9 +99,8 @@ def task1(input: Iterator[str]) -> int:
     return ret
 
 
-def task2(input: Iterator[str]) -> int:
+def task2(patterns: list[Pattern]) -> int:
     ret = 0
-    patterns = Pattern.parse_multiple(input)
     for pattern in patterns:
         if (vertical := pattern.find_vertical_reflection(1)) is not None:
             ret += vertical + 1
@@ -106,6 +109,10 @@ def task2(input: Iterator[str]) -> int:
     return ret
 
 
+def setUpModule():
+    unittest.enterModuleContext(temporary_cache())
+
+
 class InputTestCase(unittest.TestCase):
     def test_parse(self):
         input = load_file_lines('task_example.txt')
@@ -140,21 +147,21 @@ class InputTestCase(unittest.TestCase):
 
 class Task1TestCase(unittest.TestCase):
     def test_example(self):
-        input = load_file_lines('task_example.txt')
+        input = load('task_example.txt')
         self.assertEqual(405, task1(input))
 
     def test_challenge(self):
-        input = load_file_lines("task_challenge.txt")
+        input = load("task_challenge.txt")
         self.assertEqual(28651, task1(input))
 
 
 class Task2TestCase(unittest.TestCase):
     def test_example(self):
-        input = load_file_lines('task_example.txt')
+        input = load('task_example.txt')
         self.assertEqual(400, task2(input))
 
     def test_challenge(self):
-        input = load_file_lines("task_challenge.txt")
+        input = load("task_challenge.txt")
         self.assertEqual(-1, task2(input))
 
 
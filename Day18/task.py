@@ -3,7 +3,9 @@ from dataclasses import dataclass
 from enum import StrEnum
 from typing import Sequence, Self, Iterator
 
-from utils import Map, Vector, hexstr_to_int
+from utils import Vector, hexstr_to_int, load_file_lines, stream_file_lines
+from utils.cache import load_cached, temporary_cache
+from utils.grid import ByteGrid
 
 
 class Direction(StrEnum):
@@ -44,6 +46,21 @@ class Instruction:
                 hexstr_to_int(color_part[0:5])
             )
 
+    @classmethod
+    def parse_bytes(cls, line: bytes, alternate: bool = False) -> Self:
+        direction_part, len_part, color_part = line.split()
+        if not alternate:
+            return cls(
+                Direction(chr(direction_part[0])),
+                int(len_part)
+            )
+        else:
+            # (#rrrrrd): five hex digits of length followed by the direction digit
+            return cls(
+                [Direction.RIGHT, Direction.DOWN, Direction.LEFT, Direction.UP][color_part[7] - ord('0')],
+                int(color_part[2:7], 16)
+            )
+
     def apply(self, position: Vector) -> Vector:
         match self.direction:
             case Direction.DOWN:
@@ -68,6 +85,19 @@ class Instruction:
                 case Direction.RIGHT:
                     yield Vector(position.x + i, position.y)
 
+    def draw(self, map: ByteGrid, position: Vector):
+        # same cells as walk(), written as one slice per instruction
+        value = ord(self.direction.value)
+        match self.direction:
+            case Direction.DOWN:
+                map.fill_column(position.x, position.y, position.y + self.len + 1, value)
+            case Direction.UP:
+                map.fill_column(position.x, position.y - self.len, position.y + 1, value)
+            case Direction.LEFT:
+                map.fill_row(position.y, position.x - self.len + 1, position.x, value)
+            case Direction.RIGHT:
+                map.fill_row(position.y, position.x + 1, position.x + self.len, value)
+
 @dataclass
 class Input:
     instructions: list[Instruction]
@@ -79,20 +109,21 @@ class Input:
             ret.append(Instruction.parse(line, alternate))
         return cls(ret)
 
+    @classmethod
+    def parse_bytes(cls, lines: Iterator[bytes], alternate: bool = False) -> Self:
+        return cls([Instruction.parse_bytes(line, alternate) for line in lines])
+
+
+def parse_file(input: str, alternate: bool = False) -> Input:
+    return Input.parse_bytes(stream_file_lines(input, binary=True), alternate)
+
 
 def load(input: str, alternate: bool = False) -> Input:
-    from utils import load_file_lines
-    data = load_file_lines(input)
-    return Input.parse(data, alternate)
+    return load_cached(input, parse_file, alternate)
 
 
-def debug_print(map: Map):
-    for iy in range(0, map.height):
-        line = ""
-        for ix in range(0, map.width):
-            position = Vector(ix, iy)
-            line += map[position]
-        print(line + '\n')
+def debug_print(map: ByteGrid):
+    print(map.text() + '\n')
 
 
 def task(input: Input) -> int:
@@ -104,45 +135,41 @@ def task(input: Input) -> int:
         max = max.max_dim(position)
         min = min.min_dim(position)
 
-    map = Map(max.x - min.x + 1, max.y - min.y + 1, '.')
+    map = ByteGrid.filled(max.x - min.x + 1, max.y - min.y + 1, ord('.'))
     position = min.multiply(-1)
     for instruction in input.instructions:
-        for it in instruction.walk(position):
-            map[it] = instruction.direction.value
+        instruction.draw(map, position)
         position = instruction.apply(position)
 
     # debug_print(map)
 
-    def find_next(iy: int, ix: int, interesting: list[str]) -> int:
-        while ix < map.width:
-            if map[Vector(ix, iy)] in interesting:
-                break
-            ix += 1
-        return ix
+    def find_next(iy: int, ix: int, interesting: list[int]) -> int:
+        ret = map.width
+        for value in interesting:
+            if (inx := map.find(value, iy, ix)) < ret:
+                ret = inx
+        return ret
 
+    up, down = ord(Direction.UP.value), ord(Direction.DOWN.value)
     for iy in range(0, map.height):
         ix = 0
         while True:
-            if (begin_ix := find_next(iy, ix, ['U', 'D'])) >= map.width:
+            if (begin_ix := find_next(iy, ix, [up, down])) >= map.width:
                 break
-            begin_value = map[Vector(begin_ix, iy)]
-            if (end_ix := find_next(iy, begin_ix, ['D' if begin_value == 'U' else 'D'])) >= map.width:
+            if (end_ix := find_next(iy, begin_ix, [down])) >= map.width:
                 break
-            for i in range(begin_ix, end_ix + 1):
-                map[Vector(i, iy)] = '#'
+            map.fill_row(iy, begin_ix, end_ix + 1, ord('#'))
             ix = end_ix + 1
 
 
     # print("------------------------")
     # debug_print(map)
 
-    ret = 0
-    for iy in range(0, map.height):
-        for ix in range(0, map.width):
-            position = Vector(ix, iy)
-            if map[position] != '.':
-                ret += 1
-    return ret
+    return map.width * map.height - map.count(ord('.'))
+
+
+def setUpModule():
+    unittest.enterModuleContext(temporary_cache())
 
 
 class InputTestCase(unittest.TestCase):
@@ -158,6 +185,12 @@ class InputTestCase(unittest.TestCase):
         self.assertEqual(Direction.RIGHT, input.instructions[0].direction)
         self.assertEqual(461937, input.instructions[0].len)
 
+    def test_parse_bytes(self):
+        for alternate in [False, True]:
+            for line in stream_file_lines('task_challenge.txt', binary=True):
+                self.assertEqual(Instruction.parse(line.decode(), alternate), Instruction.parse_bytes(line, alternate))
+            self.assertEqual(Input.parse(load_file_lines('task_challenge.txt'), alternate), parse_file('task_challenge.txt', alternate))
+
 
 class Task1TestCase(unittest.TestCase):
     def test_example(self):
@@ -4,9 +4,10 @@ from dataclasses import dataclass
 from enum import StrEnum, property
 from typing import Self, Iterator, Optional, Tuple
 
-from _distutils_hack import override
-
-from utils import load_file_lines
+from utils import load_file_lines, stream_file_lines
+from utils.cache import load_cached, temporary_cache
+from utils.instrument import instrument, span
+from utils.tokens import fields
 
 
 @dataclass
@@ -20,6 +21,13 @@ class Part:
             {k: int(v) for k, v in [it.split('=', maxsplit=1) for it in parts]}
         )
 
+    @classmethod
+    def parse_bytes(cls, line: bytes) -> Self:
+        tokens = fields(line, b'{}=,')
+        return cls(
+            {tokens[i].decode(): int(tokens[i + 1]) for i in range(0, len(tokens) - 1, 2)}
+        )
+
     @property
     def total(self) -> int:
         return sum(self.values.values())
@@ -215,10 +223,26 @@ class System:
             parts
         )
 
+    @classmethod
+    def parse_bytes(cls, lines: Iterator[bytes]) -> Self:
+        # workflows are few and decoded for the str parser, the parts carry the bulk of the input
+        workflows = {}
+        while (line := next(lines, None)) is not None and len(line := line.strip()) > 0:
+            workflow = Workflow.parse(line.decode())
+            workflows[workflow.name] = workflow
+
+        return cls(
+            workflows,
+            [Part.parse_bytes(line) for line in lines if len(line.strip()) > 0]
+        )
+
+
+def parse_file(input: str) -> System:
+    return System.parse_bytes(stream_file_lines(input, binary=True))
+
 
 def load(input: str) -> System:
-    input = load_file_lines(input)
-    return System.parse(input)
+    return load_cached(input, parse_file)
 
 
 def task1(system: System) -> int:
@@ -243,6 +267,7 @@ def task1(system: System) -> int:
     return ret
 
 
+@instrument()
 def task2(system: System) -> int:
     ret = 0
     keys = ['x', 'm', 'a', 's']
@@ -250,36 +275,42 @@ def task2(system: System) -> int:
     accepted: list[PredicateSet] = []
     queue: list[PredicateSet] = [PredicateSet.uniform(keys,  1, 4000, 'in')]
 
-    while len(queue) > 0:
-        it = queue.pop()
-        if it.target == 'A':
-            accepted.append(it)
-            continue
-        if it.target == 'R':
-            continue
+    with span('explore'):
+        while len(queue) > 0:
+            it = queue.pop()
+            if it.target == 'A':
+                accepted.append(it)
+                continue
+            if it.target == 'R':
+                continue
 
-        workflow = system.workflows[it.target]
-        for step in workflow.steps:
-            matching, mismatching = step.match(it)
+            workflow = system.workflows[it.target]
+            for step in workflow.steps:
+                matching, mismatching = step.match(it)
 
-            if matching is not None:
-                queue.append(matching)
-            if mismatching is not None:
-                it = mismatching
-            else:
-                break
+                if matching is not None:
+                    queue.append(matching)
+                if mismatching is not None:
+                    it = mismatching
+                else:
+                    break
 
-    for it in accepted:
-        accum = 1
-        for key in keys:
-            accum *= it.predicates[key].len + 1
-        ret += accum
+    with span('count'):
+        for it in accepted:
+            accum = 1
+            for key in keys:
+                accum *= it.predicates[key].len + 1
+            ret += accum
 
     return ret
 
 # 167409079868000 <<
 # 167474394229030
 
+def setUpModule():
+    unittest.enterModuleContext(temporary_cache())
+
+
 class InputTestCase(unittest.TestCase):
     def test_parse(self):
         system = load('task_example.txt')
@@ -293,6 +324,10 @@ class InputTestCase(unittest.TestCase):
         self.assertEqual(787, system.parts[0].values['x'])
         self.assertEqual(1013, system.parts[4].values['s'])
 
+    def test_parse_part_bytes(self):
+        self.assertEqual(Part.parse('{x=787,m=2655,a=1222,s=2876}'), Part.parse_bytes(b'{x=787,m=2655,a=1222,s=2876}\n'))
+        self.assertEqual(System.parse(load_file_lines('task_challenge.txt')), parse_file('task_challenge.txt'))
+
 
 class Task1TestCase(unittest.TestCase):
     def test_example(self):
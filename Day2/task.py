@@ -1,8 +1,27 @@
+import operator
 import unittest
-from typing import Sequence, Self, Tuple
-from dataclasses import dataclass
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import compress, repeat
+from math import prod
+from typing import ClassVar, Iterable, Optional, Sequence, Self, Tuple
+from dataclasses import dataclass, field
 
-from Day2.utils import load_file
+from utils import load_file
+from utils.parallel import map_reduce_lines
+from utils.tokens import fields
+
+
+# the first letter of a color token picks its slot, a trailing comma on the token does not matter
+COLOR_SLOTS = {'r': 0, 'g': 1, 'b': 2, b'r': 0, b'g': 1, b'b': 2}
+
+
+def draw_counts(tokens: Sequence[str | bytes]) -> list[int]:
+    # tokens alternate between a count and a color
+    counts = [0, 0, 0]
+    for i in range(0, len(tokens) - 1, 2):
+        counts[COLOR_SLOTS[tokens[i + 1][:1]]] = int(tokens[i])
+    return counts
 
 
 @dataclass
@@ -13,18 +32,11 @@ class Draw:
 
     @classmethod
     def parse(cls, chunk: str) -> Self:
-        r, g, b = 0, 0, 0
-        for color_chunk in chunk.split(','):
-            count, color = color_chunk.strip().split(' ')
-            match color:
-                case 'red':
-                    r = int(count)
-                case 'green':
-                    g = int(count)
-                case 'blue':
-                    b = int(count)
+        return Draw(*draw_counts(chunk.split()))
 
-        return Draw(r, g, b)
+    @classmethod
+    def parse_bytes(cls, chunk: bytes) -> Self:
+        return Draw(*draw_counts(fields(chunk, b',')))
 
 
 @dataclass
@@ -42,6 +54,14 @@ class Game:
             draws=[Draw.parse(chunk.strip()) for chunk in draws_segment.split(';')]
         )
 
+    @classmethod
+    def parse_bytes(cls, line: bytes) -> Self:
+        colon = line.index(b':')
+        return cls(
+            number=int(line[5:colon]),
+            draws=[Draw.parse_bytes(chunk) for chunk in line[colon + 1:].split(b';')]
+        )
+
     def validate(self, max_red: int, max_green: int, max_blue: int) -> bool:
         for draw in self.draws:
             if draw.red > max_red or draw.green > max_green or draw.blue > max_blue:
@@ -62,22 +82,202 @@ class Game:
         return r * g * b
 
 
+@dataclass
+class GameTable:
+    # draws of all games as three flat color columns, game i owns rows offsets[i]:offsets[i + 1]
+    numbers: array = field(default_factory=lambda: array('q'))
+    offsets: array = field(default_factory=lambda: array('q', [0]))
+    red: array = field(default_factory=lambda: array('q'))
+    green: array = field(default_factory=lambda: array('q'))
+    blue: array = field(default_factory=lambda: array('q'))
+
+    @classmethod
+    def parse(cls, input: str) -> Self:
+        table = cls()
+        numbers, offsets, red, green, blue = table.numbers, table.offsets, table.red, table.green, table.blue
+        for line in input.splitlines():
+            colon = line.index(':')
+            numbers.append(int(line[5:colon]))
+            for chunk in line[colon + 1:].split(';'):
+                r, g, b = draw_counts(chunk.split())
+                red.append(r)
+                green.append(g)
+                blue.append(b)
+            offsets.append(len(red))
+        return table
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def game(self, index: int) -> Game:
+        begin, end = self.offsets[index], self.offsets[index + 1]
+        return Game(
+            self.numbers[index],
+            [Draw(self.red[i], self.green[i], self.blue[i]) for i in range(begin, end)]
+        )
+
+    # the reductions below chain map() over whole columns, so the per-game loop runs in C rather than bytecode
+
+    def _column_maxima(self, column: array) -> array:
+        games = map(slice, self.offsets[:-1], self.offsets[1:])
+        return array('q', map(max, map(column.__getitem__, games)))
+
+    def required(self) -> Tuple[array, array, array]:
+        return self._column_maxima(self.red), self._column_maxima(self.green), self._column_maxima(self.blue)
+
+    def feasible_numbers(self, max_red: int, max_green: int, max_blue: int) -> list[int]:
+        red, green, blue = self.required()
+        feasible = map(
+            operator.and_,
+            map(operator.and_, map(operator.le, red, repeat(max_red)), map(operator.le, green, repeat(max_green))),
+            map(operator.le, blue, repeat(max_blue))
+        )
+        return list(compress(self.numbers, feasible))
+
+    def powers(self) -> list[int]:
+        red, green, blue = self.required()
+        return list(map(operator.mul, map(operator.mul, red, green), blue))
+
+
+@dataclass
+class ThresholdIndex:
+    # 3-D prefix table over the distinct required maxima of each color, cell (i, j, k) holds the sum of game numbers
+    # needing at most reds[i - 1], greens[j - 1] and blues[k - 1]; index 0 on any axis stands for "below every game".
+    # A query is three bisections, the table holds one cell per combination of distinct maxima
+    reds: list[int]
+    greens: list[int]
+    blues: list[int]
+    sums: list[int]
+
+    MAX_CELLS: ClassVar[int] = 2**20
+
+    @staticmethod
+    def cells(table: GameTable) -> int:
+        return prod(len(set(column)) + 1 for column in table.required())
+
+    @classmethod
+    def build(cls, table: GameTable) -> Self:
+        red, green, blue = table.required()
+        reds, greens, blues = sorted(set(red)), sorted(set(green)), sorted(set(blue))
+        size_g, size_b = len(greens) + 1, len(blues) + 1
+        sums = [0] * ((len(reds) + 1) * size_g * size_b)
+        for number, r, g, b in zip(table.numbers, red, green, blue):
+            i, j, k = bisect_right(reds, r), bisect_right(greens, g), bisect_right(blues, b)
+            sums[(i * size_g + j) * size_b + k] += number
+
+        # one running sum per axis turns point masses into dominance sums
+        for stride, size in ((size_g * size_b, len(reds) + 1), (size_b, size_g), (1, size_b)):
+            for inx in range(0, len(sums)):
+                if (inx // stride) % size > 0:
+                    sums[inx] += sums[inx - stride]
+
+        return cls(reds, greens, blues, sums)
+
+    def query(self, max_red: int, max_green: int, max_blue: int) -> int:
+        i = bisect_right(self.reds, max_red)
+        j = bisect_right(self.greens, max_green)
+        k = bisect_right(self.blues, max_blue)
+        return self.sums[(i * (len(self.greens) + 1) + j) * (len(self.blues) + 1) + k]
+
+    def query_many(self, limits: Iterable[Tuple[int, int, int]]) -> list[int]:
+        return [self.query(r, g, b) for r, g, b in limits]
+
+
+@dataclass
+class ThresholdSweep:
+    # for tables too large for ThresholdIndex: a batch of limits is answered in red order while the games are swept in
+    # by red into a 2-D Fenwick tree, the outer level over green rank, every outer node a Fenwick tree over the sorted
+    # distinct blues of the games it covers. A batch of q limits over n games costs O((n + q) log^2 n) time and
+    # O(n log n) memory, so a single query pays for a whole sweep and limits should be batched
+    reds: array
+    green_ranks: array
+    blues: array
+    numbers: array
+    greens: list[int]
+    node_blues: list[list[int]]
+
+    @classmethod
+    def build(cls, table: GameTable) -> Self:
+        red, green, blue = table.required()
+        order = sorted(range(0, len(table)), key=red.__getitem__)
+        greens = sorted(set(green))
+        green_ranks = array('q', [bisect_right(greens, green[i]) for i in order])
+        node_blues = [set() for _ in range(0, len(greens) + 1)]
+        for rank, i in zip(green_ranks, order):
+            while rank < len(node_blues):
+                node_blues[rank].add(blue[i])
+                rank += rank & -rank
+
+        return cls(
+            array('q', map(red.__getitem__, order)),
+            green_ranks,
+            array('q', map(blue.__getitem__, order)),
+            array('q', map(table.numbers.__getitem__, order)),
+            greens,
+            [sorted(it) for it in node_blues]
+        )
+
+    def query(self, max_red: int, max_green: int, max_blue: int) -> int:
+        return self.query_many([(max_red, max_green, max_blue)])[0]
+
+    def query_many(self, limits: Iterable[Tuple[int, int, int]]) -> list[int]:
+        limits = list(limits)
+        node_blues = self.node_blues
+        sums = [[0] * (len(it) + 1) for it in node_blues]
+        ret = [0] * len(limits)
+        inserted = 0
+        for inx in sorted(range(0, len(limits)), key=lambda it: limits[it][0]):
+            max_red, max_green, max_blue = limits[inx]
+            while inserted < len(self.reds) and self.reds[inserted] <= max_red:
+                number, blue = self.numbers[inserted], self.blues[inserted]
+                j = self.green_ranks[inserted]
+                while j < len(node_blues):
+                    tree = sums[j]
+                    k = bisect_left(node_blues[j], blue) + 1
+                    while k < len(tree):
+                        tree[k] += number
+                        k += k & -k
+                    j += j & -j
+                inserted += 1
+
+            total = 0
+            j = bisect_right(self.greens, max_green)
+            while j > 0:
+                tree = sums[j]
+                k = bisect_right(node_blues[j], max_blue)
+                while k > 0:
+                    total += tree[k]
+                    k -= k & -k
+                j -= j & -j
+            ret[inx] = total
+        return ret
+
+
+def threshold_index(table: GameTable, max_cells: Optional[int] = None) -> ThresholdIndex | ThresholdSweep:
+    if ThresholdIndex.cells(table) > (max_cells if max_cells is not None else ThresholdIndex.MAX_CELLS):
+        return ThresholdSweep.build(table)
+    return ThresholdIndex.build(table)
+
+
+def valid_game_number(line: str) -> int:
+    max_red, max_green, max_blue = 12, 13, 14
+    game = Game.parse(line)
+    return game.number if game.validate(max_red, max_green, max_blue) else 0
+
+
+def game_power(line: str) -> int:
+    return Game.parse(line).power()
+
+
 def task1(input: str) -> int:
     max_red, max_green, max_blue = 12, 13, 14
-    games = [Game.parse(line) for line in input.splitlines()]
-    ret = 0
-    for game in games:
-        if game.validate(max_red, max_green, max_blue):
-            ret += game.number
-    return ret
+    table = GameTable.parse(input)
+    return sum(table.feasible_numbers(max_red, max_green, max_blue))
 
 
 def task2(input: str) -> int:
-    games = [Game.parse(line) for line in input.splitlines()]
-    ret = 0
-    for game in games:
-        ret += game.power()
-    return ret
+    table = GameTable.parse(input)
+    return sum(table.powers())
 
 
 class ParseGameTestCase(unittest.TestCase):
@@ -94,6 +294,48 @@ class ParseGameTestCase(unittest.TestCase):
             Game.parse("Game 2: 3 blue, 4 red; 1 red, 2 green, 6 blue; 2 green")
         )
 
+    def test_parse_game_bytes(self):
+        input = load_file('task1_challenge.txt')
+        for line in input.splitlines():
+            self.assertEqual(Game.parse(line), Game.parse_bytes(line.encode()))
+
+
+class GameTableTestCase(unittest.TestCase):
+    def test_parse(self):
+        input = load_file('task1_challenge.txt')
+        table = GameTable.parse(input)
+        games = [Game.parse(line) for line in input.splitlines()]
+        self.assertEqual(len(games), len(table))
+        for i, game in enumerate(games):
+            self.assertEqual(game, table.game(i))
+        self.assertEqual([game.required() for game in games], list(zip(*table.required())))
+
+
+class ThresholdIndexTestCase(unittest.TestCase):
+    def test_matches_scan(self):
+        table = GameTable.parse(load_file('task1_challenge.txt'))
+        limits = [(r, g, b) for r in range(0, 22, 3) for g in range(0, 22, 4) for b in range(0, 22, 5)]
+        expected = [sum(table.feasible_numbers(r, g, b)) for r, g, b in limits]
+
+        index = threshold_index(table)
+        self.assertIsInstance(index, ThresholdIndex)
+        self.assertEqual(expected, index.query_many(limits))
+        self.assertEqual(0, index.query(-1, 100, 100))
+        self.assertEqual(sum(table.numbers), index.query(100, 100, 100))
+
+        sweep = threshold_index(table, max_cells=0)
+        self.assertIsInstance(sweep, ThresholdSweep)
+        self.assertEqual(expected, sweep.query_many(limits))
+        self.assertEqual(expected[::-1], sweep.query_many(limits[::-1]))
+        self.assertEqual(0, sweep.query(-1, 100, 100))
+        self.assertEqual(sum(table.numbers), sweep.query(100, 100, 100))
+
+    def test_repeated_maxima(self):
+        table = GameTable.parse("Game 1: 2 red, 2 green, 2 blue\nGame 2: 2 red, 2 green, 2 blue\nGame 3: 1 red, 3 blue")
+        limits = [(2, 2, 2), (1, 0, 3), (1, 0, 2), (2, 1, 3), (3, 3, 3)]
+        self.assertEqual([3, 3, 0, 3, 6], ThresholdIndex.build(table).query_many(limits))
+        self.assertEqual([3, 3, 0, 3, 6], ThresholdSweep.build(table).query_many(limits))
+
 
 class Task1TestCase(unittest.TestCase):
     def test_example(self):
@@ -104,6 +346,9 @@ class Task1TestCase(unittest.TestCase):
         input = load_file("task1_challenge.txt")
         self.assertEqual(2207, task1(input))
 
+    def test_challenge_parallel(self):
+        self.assertEqual(2207, map_reduce_lines("task1_challenge.txt", valid_game_number, workers=4))
+
 
 class Task2TestCase(unittest.TestCase):
     def test_example(self):
@@ -114,6 +359,9 @@ class Task2TestCase(unittest.TestCase):
         input = load_file("task2_challenge.txt")
         self.assertEqual(62241, task2(input))
 
+    def test_challenge_parallel(self):
+        self.assertEqual(62241, map_reduce_lines("task2_challenge.txt", game_power, workers=4))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
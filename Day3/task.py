@@ -1,8 +1,16 @@
+import re
 import unittest
-from typing import Sequence, Self, List, Optional
+from typing import Iterator, Sequence, Self, List, Optional
 from dataclasses import dataclass, field
 
-from utils.utils import load_file
+from utils import load_file, load_file_lines
+from utils.grid import ByteGrid
+from utils.instrument import instrument, span
+
+
+NUMBER = re.compile(rb'\d+')
+NOT_SYMBOLS = b'.0123456789'
+NUMBER_TEXT = re.compile(r'\d+')
 
 
 @dataclass
@@ -26,6 +34,8 @@ class Grid:
     height: int
     data: List[str]
     gears: List[Gear] = field(default_factory=list)
+    # gears keyed by y * width + x, so looking one up is a single hash probe instead of a scan of gears
+    gear_index: dict[int, Gear] = field(default_factory=dict)
 
     @classmethod
     def load(cls, input: str) -> Self:
@@ -59,10 +69,12 @@ class Grid:
         if value != '*':
             return None
 
-        candidate = next((gear for gear in self.gears if gear.x == x and gear.y == y), None)
+        key = y * self.width + x
+        candidate = self.gear_index.get(key)
         if candidate is None:
             candidate = Gear(x, y)
             self.gears.append(candidate)
+            self.gear_index[key] = candidate
 
         return candidate
 
@@ -106,38 +118,114 @@ def task1(input: str) -> int:
     return ret
 
 
+def task1_masked(input: str) -> int:
+    # whole-grid variant of task1: one symbol mask, one 3x3 dilation, then a single find() per number
+    schematic = ByteGrid.from_text(input)
+    symbols = schematic.mask(value for value in range(0, 256) if value not in NOT_SYMBOLS)
+    adjacent = symbols.dilated().data
+    ret = 0
+    for y, row in enumerate(schematic.rows()):
+        offset = y * schematic.width
+        for match in NUMBER.finditer(row):
+            if adjacent.find(1, offset + match.start(), offset + match.end()) != -1:
+                ret += int(match.group())
+
+    return ret
+
+
+def row_windows(lines: Iterator[str]) -> Iterator[tuple[int, str, str, str]]:
+    # (y, above, current, below) for every row, with empty rows past the edges; at most three rows are alive at once
+    above, current = '', None
+    y = 0
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if current is not None:
+            yield y, above, current, line
+            above = current
+            y += 1
+        current = line
+    if current is not None:
+        yield y, above, current, ''
+
+
+def window_numbers(rows: tuple[str, str, str]) -> Iterator[tuple[int, int, int, bool]]:
+    # (value, begin, end, adjacent to a symbol) for every number of the middle row
+    for match in NUMBER_TEXT.finditer(rows[1]):
+        begin, end = max(match.start() - 1, 0), match.end() + 1
+        adjacent = any(len(row[begin:end].strip('.0123456789')) > 0 for row in rows)
+        yield int(match.group()), begin, end, adjacent
+
+
+def task1_stream(input: Iterator[str]) -> int:
+    ret = 0
+    for y, above, current, below in row_windows(input):
+        for value, _, _, adjacent in window_numbers((above, current, below)):
+            if adjacent:
+                ret += value
+    return ret
+
+
+def task2_stream(input: Iterator[str]) -> int:
+    # part numbers of the gears on row y - 1 are complete once row y has been scanned, so only gears of the
+    # three rows in the window are ever pending
+    pending: dict[int, dict[int, List[int]]] = dict()
+
+    def ratio(parts: List[int]) -> int:
+        return parts[0] * parts[1] if len(parts) == 2 else 0
+
+    ret = 0
+    for y, above, current, below in row_windows(input):
+        for value, begin, end, adjacent in window_numbers((above, current, below)):
+            if not adjacent:
+                continue
+            for gy, row in ((y - 1, above), (y, current), (y + 1, below)):
+                x = row.find('*', begin, end)
+                while x != -1:
+                    pending.setdefault(gy, dict()).setdefault(x, []).append(value)
+                    x = row.find('*', x + 1, end)
+        ret += sum(map(ratio, pending.pop(y - 1, dict()).values()))
+
+    for gears in pending.values():
+        ret += sum(map(ratio, gears.values()))
+    return ret
+
+
+@instrument()
 def task2(input: str) -> int:
-    grid = Grid.load(input)
+    with span('parse'):
+        grid = Grid.load(input)
     ret = 0
 
-    gears: List[Gear] = list()
+    # keyed like Grid.gear_index, a digit touching the same gear as its neighbour must not count it twice
+    gears: dict[int, Gear] = dict()
     start = -1
     value = 0
-    for iy in range(0, grid.height):
-        for ix in range(0, grid.width + 1):
-            cell = grid.get(ix, iy)
-            if cell.isdigit():
-                if start == -1:
-                    start = ix
-                value = value * 10 + int(cell)
-                cell_gears = grid.adjacent_gears(ix, iy)
-                for gear in cell_gears:
-                    if gear not in gears:
-                        gears.append(gear)
-            else:
-                if start != -1 and len(gears) > 0:
-                    part_number = PartNumber(start, iy, ix - start, value)
-                    for gear in gears:
-                        gear.adjacent_part_numbers.append(part_number)
-                gears.clear()
-                value = 0
-                start = -1
+    with span('scan'):
+        for iy in range(0, grid.height):
+            for ix in range(0, grid.width + 1):
+                cell = grid.get(ix, iy)
+                if cell.isdigit():
+                    if start == -1:
+                        start = ix
+                    value = value * 10 + int(cell)
+                    cell_gears = grid.adjacent_gears(ix, iy)
+                    for gear in cell_gears:
+                        gears[gear.y * grid.width + gear.x] = gear
+                else:
+                    if start != -1 and len(gears) > 0:
+                        part_number = PartNumber(start, iy, ix - start, value)
+                        for gear in gears.values():
+                            gear.adjacent_part_numbers.append(part_number)
+                    gears.clear()
+                    value = 0
+                    start = -1
 
     ret = 0
-    for gear in grid.gears:
-        if len(gear.adjacent_part_numbers) != 2:
-            continue
-        ret += gear.adjacent_part_numbers[0].value * gear.adjacent_part_numbers[1].value
+    with span('ratios'):
+        for gear in grid.gears:
+            if len(gear.adjacent_part_numbers) != 2:
+                continue
+            ret += gear.adjacent_part_numbers[0].value * gear.adjacent_part_numbers[1].value
 
     return ret
 
@@ -192,12 +280,25 @@ class Task1TestCase(unittest.TestCase):
         input = load_file("task1_challenge.txt")
         self.assertEqual(532428, task1(input))
 
+    def test_masked(self):
+        for name in ['task1_example.txt', 'task1_challenge.txt']:
+            input = load_file(name)
+            self.assertEqual(task1(input), task1_masked(input))
+
+    def test_stream(self):
+        for name in ['task1_example.txt', 'task1_challenge.txt']:
+            self.assertEqual(task1(load_file(name)), task1_stream(load_file_lines(name)))
+
 
 class Task2TestCase(unittest.TestCase):
     def test_example(self):
         input = load_file('task2_example.txt')
         self.assertEqual(467835, task2(input))
 
+    def test_stream(self):
+        for name in ['task2_example.txt', 'task2_challenge.txt']:
+            self.assertEqual(task2(load_file(name)), task2_stream(load_file_lines(name)))
+
     def test_challenge(self):
         input = load_file("task2_challenge.txt")
         self.assertEqual(-1, task2(input))
@@ -1,9 +1,40 @@
+import operator
 import unittest
+from array import array
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Sequence, Self, List
+from functools import reduce
+from typing import Iterator, Sequence, Self, List
 
+from utils import load_file, load_file_lines
+from utils.parallel import map_reduce_lines
 
-from utils import load_file
+
+def bitset(numbers: Sequence[int]) -> int:
+    ret = 0
+    for number in numbers:
+        ret |= 1 << number
+    return ret
+
+
+class TokenBits(dict):
+    # bit of a number keyed by its decimal token, so a deck can be masked without parsing a single int
+    def __missing__(self, key: str) -> int:
+        return 1 << int(key)
+
+
+TOKEN_BITS = TokenBits({str(it): 1 << it for it in range(0, 100)})
+
+
+def matches(winning: Sequence, winning_mask: int, your_mask: int, bit) -> int:
+    # a winning number listed twice counts twice, only then the AND and popcount need a per number fallback
+    if winning_mask.bit_count() == len(winning):
+        return (winning_mask & your_mask).bit_count()
+    return sum(1 for it in winning if bit(it) & your_mask)
+
+
+def score(matches: int) -> int:
+    return (1 << matches) >> 1
 
 
 @dataclass
@@ -11,19 +42,16 @@ class Card:
     number: int
     winning_numbers: List[int]
     your_numbers: List[int]
+    winning_mask: int = field(init=False, repr=False)
+    your_mask: int = field(init=False, repr=False)
     matches: int = field(init=False)
     score: int = field(init=False)
 
     def __post_init__(self):
-        ret = 0
-        for winning in self.winning_numbers:
-            if winning in self.your_numbers:
-                ret += 1
-        self.matches = ret
-        if ret == 0:
-            self.score = 0
-        else:
-            self.score = 2**(ret - 1)
+        self.winning_mask = bitset(self.winning_numbers)
+        self.your_mask = bitset(self.your_numbers)
+        self.matches = matches(self.winning_numbers, self.winning_mask, self.your_mask, (1).__lshift__)
+        self.score = score(self.matches)
 
     @classmethod
     def load(cls, line: str) -> Self:
@@ -42,25 +70,75 @@ class Card:
         return [cls.load(line) for line in lines]
 
 
+def line_matches(line: str) -> int:
+    # every token is turned into its bit by a table lookup inside map() and the bits are or-ed together
+    bits = TOKEN_BITS.__getitem__
+    winning_part, your_part = line[line.index(':') + 1:].split('|', maxsplit=1)
+    winning = winning_part.split()
+    winning_mask = reduce(operator.or_, map(bits, winning), 0)
+    your_mask = reduce(operator.or_, map(bits, your_part.split()), 0)
+    return matches(winning, winning_mask, your_mask, bits)
+
+
+def match_counts(input: str) -> array:
+    # whole-deck path, no Card objects and no int parsing
+    return array('l', map(line_matches, input.splitlines()))
+
+
+def cascade(matches: Sequence[int]) -> int:
+    # copies won by card i are added at i + 1 and taken back at i + matches + 1, so every card costs O(1)
+    # however many cards it wins
+    size = len(matches)
+    # copy counts grow exponentially with match counts, so plain ints rather than a fixed width array
+    difference = [0] * (size + 1)
+    running = 0
+    total = 0
+    for i, count in enumerate(matches):
+        running += difference[i]
+        copies = running + 1
+        total += copies
+        end = min(i + count + 1, size)
+        if end > i + 1:
+            difference[i + 1] += copies
+            difference[end] -= copies
+    return total
+
+
+def cascade_stream(lines: Iterator[str]) -> int:
+    # same cascade over a card stream, the window only reaches as far ahead as the largest match count so far;
+    # copies of cards past the end of the deck are never read
+    window: deque[int] = deque()
+    running = 0
+    total = 0
+    for line in lines:
+        if len(line.strip()) == 0:
+            continue
+        running += window.popleft() if len(window) > 0 else 0
+        copies = running + 1
+        total += copies
+        count = line_matches(line)
+        if count > 0:
+            while len(window) <= count:
+                window.append(0)
+            window[0] += copies
+            window[count] -= copies
+    return total
+
+
+def card_score(line: str) -> int:
+    return score(line_matches(line))
+
+
 def task1(input: str) -> int:
-    cards = Card.load_many(input)
-    ret = 0
-    for card in cards:
-        ret += card.score
-    return ret
+    return sum(map(card_score, input.splitlines()))
 
 
 def task2(input: str) -> int:
-    ret = 0
-    cards = Card.load_many(input)
-    multiples = {it: 1 for it in range(1, len(cards) + 1)}
-    for card in cards:
-        for i in range(0, card.matches):
-            key = card.number + i + 1
-            if key not in multiples:
-                break
-            multiples[key] = multiples[key] + multiples[card.number]
-    return sum(multiples.values())
+    return cascade(match_counts(input))
+
+
+def task2_stream(input: Iterator[str]) -> int:
+    return cascade_stream(input)
 
 
 class InputTestCase(unittest.TestCase):
@@ -72,6 +150,18 @@ class InputTestCase(unittest.TestCase):
         self.assertListEqual([83, 86, 6, 31, 17, 9, 48, 53], cards[0].your_numbers)
 
 
+class MatchCountsTestCase(unittest.TestCase):
+    def test_match_counts(self):
+        input = load_file('task1_challenge.txt')
+        self.assertListEqual([card.matches for card in Card.load_many(input)], list(match_counts(input)))
+        self.assertListEqual([2], list(match_counts("Card 1: 3 150 7 | 150 9 3")))
+
+    def test_repeated_numbers(self):
+        for line, expected in [("Card 1: 99 99 | 100", 0), ("Card 1: 3 3 | 3", 2), ("Card 1: 3 5 | 3 3 5", 2)]:
+            self.assertEqual(expected, line_matches(line))
+            self.assertEqual(expected, Card.load(line).matches)
+
+
 class Task1TestCase(unittest.TestCase):
     def test_example(self):
         input = load_file('task1_example.txt')
@@ -81,6 +171,9 @@ class Task1TestCase(unittest.TestCase):
         input = load_file("task1_challenge.txt")
         self.assertEqual(28750, task1(input))
 
+    def test_challenge_parallel(self):
+        self.assertEqual(28750, map_reduce_lines("task1_challenge.txt", card_score, workers=4))
+
 
 class Task2TestCase(unittest.TestCase):
     def test_example(self):
@@ -91,6 +184,19 @@ class Task2TestCase(unittest.TestCase):
         input = load_file("task2_challenge.txt")
         self.assertEqual(10212704, task2(input))
 
+    def test_stream(self):
+        self.assertEqual(30, task2_stream(load_file_lines('task2_example.txt')))
+        self.assertEqual(10212704, task2_stream(load_file_lines('task2_challenge.txt')))
+
+    def test_cascade_past_end(self):
+        self.assertEqual(1 + 2 + 4, cascade([5, 1, 0]))
+
+    def test_cascade_large_counts(self):
+        expected = cascade_stream(iter(["Card 1: 1 2 | 1 2"] * 200))
+        self.assertEqual(1923063428480944139667114773918309212080325, expected)
+        self.assertEqual(expected, cascade([2] * 200))
+        self.assertEqual(1 + 2 + 4, cascade_stream(iter(["Card 1: 1 2 3 4 5 | 1 2 3 4 5", "Card 2: 1 | 1", "Card 3: 1 | 2"])))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,11 +1,15 @@
 import math
 import unittest
-from dataclasses import dataclass
+from bisect import bisect_right
+from dataclasses import dataclass, field
 from collections.abc import Sequence
 from typing import Self, List, Iterator, Optional, Tuple
 
 from utils import load_file, load_file_lines
 
+# upper bound of every value, so pieces() can describe the identity tail of a mapping
+INF = 2**48
+
 
 @dataclass
 class ValueRange:
@@ -106,6 +110,13 @@ class Mapping:
     source: str
     target: str
     ranges: List[MappingRange]
+    # ranges ordered by source with their sources alongside, a lookup is one bisect instead of a scan of ranges
+    _sorted: List[MappingRange] = field(init=False, repr=False, compare=False)
+    _sources: List[int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._sorted = sorted(self.ranges, key=lambda it: it.source)
+        self._sources = [it.source for it in self._sorted]
 
     @classmethod
     def parse(cls, input: Iterator[str]) -> Optional[Self]:
@@ -126,11 +137,53 @@ class Mapping:
         )
 
     def map(self, input: int) -> int:
-        for it in self.ranges:
-            if it.source <= input < it.source + it.length:
+        inx = bisect_right(self._sources, input) - 1
+        if inx >= 0:
+            it = self._sorted[inx]
+            if input < it.source + it.length:
                 return input - it.source + it.target
         return input
 
+    def map_many(self, values: Sequence[int]) -> List[int]:
+        # one merge-like sweep of the sorted values against the sorted ranges, results keep the order of values
+        ret = list(values)
+        ranges = self._sorted
+        inx = -1
+        for position in sorted(range(0, len(values)), key=values.__getitem__):
+            value = values[position]
+            while inx + 1 < len(ranges) and ranges[inx + 1].source <= value:
+                inx += 1
+            if inx >= 0 and value < ranges[inx].source + ranges[inx].length:
+                ret[position] = value - ranges[inx].source + ranges[inx].target
+        return ret
+
+    def pieces(self) -> Iterator[Tuple[int, int, int]]:
+        # (begin, end, offset) covering [0, INF) in order, including the identity gaps between ranges
+        position = 0
+        for it in self._sorted:
+            if it.source > position:
+                yield position, it.source, 0
+            yield it.source, it.end, it.target - it.source
+            position = it.end
+        yield position, INF, 0
+
+    def compose(self, other: Self) -> Self:
+        # mapping applying self and then other, identity pieces are left implicit
+        other_pieces = list(other.pieces())
+        other_begins = [it[0] for it in other_pieces]
+        ranges = []
+        for begin, end, offset in self.pieces():
+            low, high = begin + offset, end + offset
+            inx = bisect_right(other_begins, low) - 1
+            while low < high:
+                _, other_end, other_offset = other_pieces[inx]
+                cut = min(high, other_end)
+                if offset + other_offset != 0:
+                    ranges.append(MappingRange(low - offset, low + other_offset, cut - low))
+                low = cut
+                inx += 1
+        return Mapping(self.source, other.target, ranges)
+
     def map_range(self, input: ValueRange) -> List[ValueRange]:
         ret = []
         vit = input
@@ -143,6 +196,7 @@ class Mapping:
 class Almanac:
     seeds: List[int]
     mappings: List[Mapping]
+    _composed: Optional[Mapping] = field(init=False, default=None, repr=False, compare=False)
 
     @classmethod
     def parse(cls, input: Iterator[str]) -> Self:
@@ -157,17 +211,25 @@ class Almanac:
             mappings.append(mapping)
         return cls(seeds, mappings)
 
+    def composed(self) -> Mapping:
+        # all mappings folded into one, computed on first use and reused for every seed set after that;
+        # without any mapping that is the identity
+        if self._composed is None:
+            ret = Mapping('seed', 'seed', []) if len(self.mappings) == 0 else self.mappings[0]
+            for mapping in self.mappings[1:]:
+                ret = ret.compose(mapping)
+            self._composed = ret
+        return self._composed
+
 
 def task1(input: Iterator[str]) -> int:
+    # one batch of seeds costs less pushed through each mapping than composing them first,
+    # composed() pays off once the same almanac maps many seed sets
     almanac = Almanac.parse(input)
-    ret = math.inf
-    for seed in almanac.seeds:
-        it = seed
-        for mapping in almanac.mappings:
-            it = mapping.map(it)
-        if it < ret:
-            ret = it
-    return ret
+    values = almanac.seeds
+    for mapping in almanac.mappings:
+        values = mapping.map_many(values)
+    return min(values, default=math.inf)
 
 
 def task2(input: Iterator[str]) -> int:
@@ -239,6 +301,23 @@ class InputTestCase(unittest.TestCase):
         self.assertEqual(87, mapping.map(94))
         self.assertEqual(5, mapping.map(5))
         self.assertEqual(95, mapping.map(95))
+        self.assertListEqual([88, 94, 18, 87, 5, 95, 88], mapping.map_many([18, 24, 25, 94, 5, 95, 18]))
+
+    def test_composed(self):
+        almanac = Almanac.parse(load_file_lines('task1_challenge.txt'))
+        composed = almanac.composed()
+        self.assertIs(composed, almanac.composed())
+        self.assertEqual(almanac.mappings[0].source, composed.source)
+        self.assertEqual(almanac.mappings[-1].target, composed.target)
+        for seed in almanac.seeds + list(range(0, 10**10, 10**7)):
+            it = seed
+            for mapping in almanac.mappings:
+                it = mapping.map(it)
+            self.assertEqual(it, composed.map(seed))
+
+    def test_composed_empty(self):
+        almanac = Almanac.parse(iter(['seeds: 5 7\n', '\n']))
+        self.assertListEqual([5, 7], almanac.composed().map_many(almanac.seeds))
 
     def test_mapping_single_range_1(self):
         mapping_range = MappingRange(10, 40, 5)
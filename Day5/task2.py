@@ -1,10 +1,14 @@
 import math
 import unittest
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass, field
 from collections.abc import Sequence
 from typing import Self, List, Iterator, Optional, Tuple
 
 from utils import load_file, load_file_lines
+from utils.cache import load_cached, temporary_cache
+from utils.generators import generate
+from utils.instrument import RECORDER, disable, enable, instrument, record, span
 
 INF = 2**48
 
@@ -34,50 +38,66 @@ class DataSpan(Span):
 
 @dataclass
 class Layer:
+    # ordered spans covering the whole line without gaps, _begins holds their begins for bisection
     spans: list[DataSpan] = field(init=False, default_factory=list)
+    _begins: list[int] = field(init=False, default_factory=list, repr=False, compare=False)
 
     def __post_init__(self):
         self.spans.append(DataSpan.infinite())
+        self._begins.append(-INF)
 
     def add_span(self, span: DataSpan):
-        new_spans = []
-        for it in self.spans:
-            if it.begin >= span.end or it.end < span.begin:
-                new_spans.append(it)
-                continue
-
-            if it.begin < span.begin:
-                new_spans.append(DataSpan(it.begin, span.begin, it.value))
-                new_spans.append(span)
-                if it.end > span.end:
-                    new_spans.append(DataSpan(span.end, it.end, it.value))
-            else:
-                if it.end > span.end:
-                    new_spans.append(DataSpan(span.end, it.end, it.value))
-
-        self.spans = new_spans
+        # only the spans overlapping the new one are touched, the ones they stick out of keep their rest
+        first = bisect_right(self._begins, span.begin) - 1
+        last = bisect_left(self._begins, span.end)
+        replacement = []
+        if self.spans[first].begin < span.begin:
+            replacement.append(DataSpan(self.spans[first].begin, span.begin, self.spans[first].value))
+        replacement.append(span)
+        if self.spans[last - 1].end > span.end:
+            replacement.append(DataSpan(span.end, self.spans[last - 1].end, self.spans[last - 1].value))
+
+        self.spans[first:last] = replacement
+        self._begins[first:last] = [it.begin for it in replacement]
 
     def query(self, position: int) -> DataSpan:
-        for span in self.spans:
-            if span.begin <= position < span.end:
-                return span
+        return self.spans[bisect_right(self._begins, position) - 1]
 
     def intersect(self, span: Span) -> list[DataSpan]:
         ret = []
+        inx = max(bisect_right(self._begins, span.begin) - 1, 0)
+        while inx < len(self.spans) and self.spans[inx].begin < span.end:
+            it = self.spans[inx]
+            if it.end > span.begin:
+                ret.append(DataSpan(max(it.begin, span.begin), min(it.end, span.end), it.value))
+            inx += 1
+        return ret
+
+    @classmethod
+    def from_spans(cls, spans: list[DataSpan]) -> Self:
+        # spans have to be ordered and cover the whole line, as compose() produces them
+        layer = cls()
+        layer.spans = spans
+        layer._begins = [it.begin for it in spans]
+        return layer
+
+    def coalesced(self) -> Self:
+        # neighbouring spans with the same offset merged into one
+        spans = []
         for it in self.spans:
-            if it.begin >= span.end or it.end <= span.begin:
-                continue
-            if it.begin < span.begin:
-                if it.end > span.end:
-                    ret.append(DataSpan(span.begin, span.end, it.value))
-                else:
-                    ret.append(DataSpan(span.begin, it.end, it.value))
+            if len(spans) > 0 and spans[-1].value == it.value:
+                spans[-1] = DataSpan(spans[-1].begin, it.end, it.value)
             else:
-                if it.end > span.end:
-                    ret.append(DataSpan(it.begin, span.end, it.value))
-                else:
-                    ret.append(DataSpan(it.begin, it.end, it.value))
-        return ret
+                spans.append(it)
+        return Layer.from_spans(spans)
+
+    def compose(self, other: Self) -> Self:
+        # layer applying self and then other; every span of self is cut where its image crosses a span of other
+        spans = []
+        for it in self.spans:
+            for piece in other.intersect(Span(it.begin + it.value, it.end + it.value)):
+                spans.append(DataSpan(piece.begin - it.value, piece.end - it.value, it.value + piece.value))
+        return Layer.from_spans(spans)
 
     @classmethod
     def parse(cls, input: Iterator[str]) -> Optional[Self]:
@@ -104,6 +124,18 @@ class Layer:
 class Almanac2:
     seeds: list[Span]
     layers: list[Layer]
+    _composed: Optional[Layer] = field(init=False, default=None, repr=False, compare=False)
+
+    def composed(self) -> Layer:
+        # all layers folded into one, computed on first use and reused for every seed set after that;
+        # the span count after every step is recorded as the 'composed_spans' metric
+        if self._composed is None:
+            ret = Layer()
+            for layer in self.layers:
+                ret = ret.compose(layer).coalesced()
+                record('composed_spans', len(ret.spans))
+            self._composed = ret
+        return self._composed
 
     @classmethod
     def parse(cls, input: Iterator[str]) -> Self:
@@ -125,23 +157,72 @@ class Almanac2:
         return cls(seeds, layers)
 
 
-def task2(input: Iterator[str]) -> int:
-    almanac = Almanac2.parse(input)
-    ret = math.inf
-    for sit in almanac.seeds:
-        current_spans = [sit]
-        for lit in almanac.layers:
-            next_span = []
-            for csit in current_spans:
-                intersected = lit.intersect(csit)
-                next_span.extend([Span(i.begin + i.value, i.end + i.value) for i in intersected])
-            current_spans = next_span
+def coalesce(spans: list[Span]) -> list[Span]:
+    # sorted, with overlapping and touching spans merged
+    ret = []
+    for it in sorted(spans, key=lambda it: it.begin):
+        if len(ret) > 0 and it.begin <= ret[-1].end:
+            if it.end > ret[-1].end:
+                ret[-1] = Span(ret[-1].begin, it.end)
+        else:
+            ret.append(it)
+    return ret
+
+
+def propagate(almanac: Almanac2, seeds: list[Span], counts: Optional[list[int]] = None) -> list[Span]:
+    # image of the seeds pushed through the layers one at a time, coalesced after every layer so the working set
+    # stays bounded by the breakpoints; counts receives the number of spans left after each layer
+    current_spans = coalesce(seeds)
+    for lit in almanac.layers:
+        next_span = []
         for csit in current_spans:
-            if csit.begin < ret:
-                ret = csit.begin
+            intersected = lit.intersect(csit)
+            next_span.extend([Span(i.begin + i.value, i.end + i.value) for i in intersected])
+        current_spans = coalesce(next_span)
+        if counts is not None:
+            counts.append(len(current_spans))
+        record('propagated_spans', len(current_spans))
+    return current_spans
+
+
+def lowest_location(almanac: Almanac2, seeds: Optional[list[Span]] = None) -> int | float:
+    # walks the composed layer in ascending order of location. Layers need not be bijections (targets may overlap
+    # each other and the identity gaps), so images of different spans can overlap: a hit only bounds the answer,
+    # and the walk stops once the next image begins at or above the best location found so far. Composing costs
+    # more than one propagate(), so this only pays off when the same almanac answers many seed sets
+    seeds = coalesce(almanac.seeds if seeds is None else seeds)
+    seed_begins = [it.begin for it in seeds]
+    ret = math.inf
+    for it in sorted(almanac.composed().spans, key=lambda it: it.begin + it.value):
+        if it.begin + it.value >= ret:
+            break
+        inx = bisect_right(seed_begins, it.begin) - 1
+        if inx >= 0 and seeds[inx].end > it.begin:
+            ret = it.begin + it.value
+        elif inx + 1 < len(seeds) and seeds[inx + 1].begin < it.end:
+            ret = min(ret, seeds[inx + 1].begin + it.value)
     return ret
 
 
+def parse_file(input: str) -> Almanac2:
+    return Almanac2.parse(load_file_lines(input))
+
+
+def load(input: str) -> Almanac2:
+    return load_cached(input, parse_file)
+
+
+@instrument()
+def task2(almanac: Almanac2) -> int:
+    with span('propagate'):
+        spans = propagate(almanac, almanac.seeds)
+    return spans[0].begin if len(spans) > 0 else math.inf
+
+
+def setUpModule():
+    unittest.enterModuleContext(temporary_cache())
+
+
 class InputTestCase(unittest.TestCase):
     def test_parse_almanac2(self):
         lines = load_file_lines('task2_example.txt')
@@ -197,13 +278,89 @@ class InputTestCase(unittest.TestCase):
         )
 
 
+    def test_composed(self):
+        almanac = Almanac2.parse(load_file_lines('task2_challenge.txt'))
+        composed = almanac.composed()
+        self.assertIs(composed, almanac.composed())
+        for seed in almanac.seeds:
+            self.assertEqual(
+                propagate(almanac, [seed]),
+                coalesce([Span(it.begin + it.value, it.end + it.value) for it in composed.intersect(seed)])
+            )
+
+    def test_propagate_counts(self):
+        almanac = Almanac2.parse(load_file_lines('task2_example.txt'))
+        counts = []
+        spans = propagate(almanac, almanac.seeds, counts)
+        self.assertEqual(len(almanac.layers), len(counts))
+        self.assertEqual(len(spans), counts[-1])
+        self.assertEqual(46, spans[0].begin)
+
+    def test_lowest_location(self):
+        for name in ['task2_example.txt', 'task2_challenge.txt']:
+            almanac = Almanac2.parse(load_file_lines(name))
+            self.assertEqual(propagate(almanac, almanac.seeds)[0].begin, lowest_location(almanac))
+
+    def test_composed_metric(self):
+        almanac = load('task2_example.txt')
+        RECORDER.reset()
+        enable()
+        try:
+            almanac.composed()
+        finally:
+            disable()
+        counts = RECORDER.metrics()['composed_spans']
+        RECORDER.reset()
+        self.assertEqual(len(almanac.layers), len(counts))
+        self.assertEqual(len(almanac.composed().spans), counts[-1])
+
+    def test_lowest_location_overlapping_images(self):
+        almanac = Almanac2.parse(iter([
+            'seeds: 37 8 16 7\n', '\n',
+            'a-to-b map:\n', '43 1 8\n', '\n',
+            'b-to-c map:\n', '37 3 5\n', '41 10 6\n', '26 17 6\n', '\n',
+            'c-to-d map:\n', '48 1 3\n', '41 6 2\n', '40 12 8\n', '\n',
+        ]))
+        self.assertEqual(26, propagate(almanac, almanac.seeds)[0].begin)
+        self.assertEqual(26, lowest_location(almanac))
+
+    def test_lowest_location_generated(self):
+        for seed in range(0, 200):
+            input = generate('Day5', 4, seed, ranges=5, seeds=3, universe=60, overlapping=1)
+            almanac = Almanac2.parse(iter(input.splitlines(keepends=True)))
+            self.assertEqual(propagate(almanac, almanac.seeds)[0].begin, lowest_location(almanac), input)
+
+    def test_lowest_location_batches(self):
+        almanac = Almanac2.parse(load_file_lines('task2_challenge.txt'))
+        for seed in almanac.seeds:
+            self.assertEqual(propagate(almanac, [seed])[0].begin, lowest_location(almanac, [seed]))
+
+    def test_coalesce(self):
+        self.assertListEqual(
+            [Span(1, 8), Span(9, 12)],
+            coalesce([Span(9, 10), Span(5, 8), Span(1, 5), Span(10, 12), Span(2, 3)])
+        )
+
+    def test_layer_shared_boundaries(self):
+        layer = Layer()
+        layer.add_span(DataSpan(5, 15, 3))
+        layer.add_span(DataSpan(5, 10, 1))
+        layer.add_span(DataSpan(0, 20, 7))
+        layer.add_span(DataSpan(20, 25, 2))
+        self.assertListEqual(
+            [DataSpan(-INF, 0, 0), DataSpan(0, 20, 7), DataSpan(20, 25, 2), DataSpan(25, INF, 0)],
+            layer.spans
+        )
+        self.assertEqual(DataSpan(20, 25, 2), layer.query(20))
+
+
 class Task2TestCase(unittest.TestCase):
     def test_example(self):
-        input = load_file_lines('task2_example.txt')
+        input = load('task2_example.txt')
         self.assertEqual(46, task2(input))
 
     def test_challenge(self):
-        input = load_file_lines("task2_challenge.txt")
+        input = load("task2_challenge.txt")
         self.assertEqual(2008785, task2(input))
 
 
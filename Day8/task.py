@@ -2,7 +2,9 @@ import unittest
 from dataclasses import dataclass
 from typing import Sequence, Self, List, Iterator, Tuple, Callable
 
-from utils import load_file, load_file_lines
+from utils import load_file_lines, stream_file_lines
+from utils.cache import load_cached, temporary_cache
+from utils.tokens import fields
 
 
 @dataclass
@@ -22,6 +24,15 @@ class Node:
             nodes[1]
         )
 
+    @classmethod
+    def parse_bytes(cls, input: bytes) -> Self:
+        id, left, right = fields(input, b'=(),')
+        return cls(
+            id.decode(),
+            left.decode(),
+            right.decode()
+        )
+
 
 @dataclass
 class Map:
@@ -40,6 +51,13 @@ class Map:
             nodes.append(Node.parse(line))
         return cls(steps, {it.id: it for it in nodes})
 
+    @classmethod
+    def parse_bytes(cls, input: Iterator[bytes]) -> Self:
+        steps = next(input).strip().decode()
+        next(input) # empty line
+        nodes = [Node.parse_bytes(line) for line in input]
+        return cls(steps, {it.id: it for it in nodes})
+
     def run(self, node: Node, start_at : int, end_test: Callable[[str], bool]) -> Tuple[int, Node]:
         steps_taken = 0
         step_index = start_at % len(self.steps)
@@ -57,14 +75,19 @@ class Map:
                 it = self.nodes[it.right]
 
 
-def task1(input: Iterator[str]) -> int:
-    ret = 0
-    map = Map.parse(input)
+def parse_file(input: str) -> Map:
+    return Map.parse_bytes(stream_file_lines(input, binary=True))
+
+
+def load(input: str) -> Map:
+    return load_cached(input, parse_file)
+
+
+def task1(map: Map) -> int:
     return map.run(map.nodes['AAA'], 0, lambda id: id == 'ZZZ')[0]
 
 
-def task2(input: Iterator[str]) -> int:
-    map = Map.parse(input)
+def task2(map: Map) -> int:
     start_nodes = [node for node in map.nodes.values() if node.id[2] == 'A']
     cycles = []
     for node in start_nodes:
@@ -88,6 +111,10 @@ def task2(input: Iterator[str]) -> int:
         accum[smallest_inx] = smallest_value + cycles[smallest_inx]
 
 
+def setUpModule():
+    unittest.enterModuleContext(temporary_cache())
+
+
 class InputTestCase(unittest.TestCase):
     def test_parse_node(self):
         node = Node.parse('AAA = (BBB, CCC)\n')
@@ -95,25 +122,31 @@ class InputTestCase(unittest.TestCase):
         self.assertEqual('BBB', node.left)
         self.assertEqual('CCC', node.right)
 
+    def test_parse_node_bytes(self):
+        self.assertEqual(Node.parse('AAA = (BBB, CCC)\n'), Node.parse_bytes(b'AAA = (BBB, CCC)\n'))
+
+    def test_parse_map_bytes(self):
+        self.assertEqual(Map.parse(load_file_lines('task1_challenge.txt')), load('task1_challenge.txt'))
+
 
 class Task1TestCase(unittest.TestCase):
     def test_example(self):
-        input = load_file_lines('task1_example.txt')
-        self.assertEqual(6, task1(input))
+        map = load('task1_example.txt')
+        self.assertEqual(6, task1(map))
 
     def test_challenge(self):
-        input = load_file_lines("task1_challenge.txt")
-        self.assertEqual(12737, task1(input))
+        map = load("task1_challenge.txt")
+        self.assertEqual(12737, task1(map))
 
 
 class Task2TestCase(unittest.TestCase):
     def test_example(self):
-        input = load_file_lines('task2_example.txt')
-        self.assertEqual(6, task2(input))
+        map = load('task2_example.txt')
+        self.assertEqual(6, task2(map))
 
     def test_challenge(self):
-        input = load_file_lines("task2_challenge.txt")
-        self.assertEqual(-1, task2(input))
+        map = load("task2_challenge.txt")
+        self.assertEqual(-1, task2(map))
 
 
 if __name__ == '__main__':
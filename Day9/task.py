@@ -3,6 +3,7 @@ from dataclasses import dataclass
 from typing import Sequence, Self, List, Tuple
 
 from utils import load_file
+from utils.parallel import map_reduce_lines
 
 def is_all_zeros(input : list[int]) -> bool:
     for it in input:
@@ -24,12 +25,25 @@ def reduce(line: str) -> Tuple[list[int], list[int]]:
     return beginnings, endings
 
 
+def next_value(line: str) -> int:
+    _, endings = reduce(line)
+    return sum(endings)
+
+
+def previous_value(line: str) -> int:
+    beginnings, _ = reduce(line)
+    accum = 0
+    beginnings.reverse()
+    for it in beginnings:
+        accum = it - accum
+    return accum
+
+
 def task1(input: str) -> int:
     ret = 0
     lines = input.splitlines()
     for line in lines:
-        _, endings = reduce(line)
-        ret += sum(endings)
+        ret += next_value(line)
     return ret
 
 
@@ -37,12 +51,7 @@ def task2(input: str) -> int:
     ret = 0
     lines = input.splitlines()
     for line in lines:
-        beginnings, _ = reduce(line)
-        accum = 0
-        beginnings.reverse()
-        for it in beginnings:
-            accum = it - accum
-        ret += accum
+        ret += previous_value(line)
     return ret
 
 
@@ -70,6 +79,9 @@ class Task2TestCase(unittest.TestCase):
         input = load_file("task2_challenge.txt")
         self.assertEqual(923, task2(input))
 
+    def test_challenge_parallel(self):
+        self.assertEqual(923, map_reduce_lines("task2_challenge.txt", previous_value, workers=4))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
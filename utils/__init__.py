@@ -1,5 +1,9 @@
+import mmap
+import os
+import unittest
+from array import array
 from dataclasses import dataclass, field
-from typing import Iterator, Self
+from typing import Iterable, Iterator, Self
 
 
 def load_file(path: str) -> str:
@@ -7,16 +11,77 @@ def load_file(path: str) -> str:
         return fp.read()
 
 
-def load_file_lines(path: str) -> Iterator[str]:
-    with open(path, 'r') as fp:
-        return iter(fp.readlines())
+def load_file_bytes(path: str) -> bytes:
+    with open(path, 'rb') as fp:
+        return fp.read()
 
 
-@dataclass(frozen=True)
+def load_file_lines(path: str) -> Iterator[str]:
+    return stream_file_lines(path)
+
+
+class LineStream:
+    # lines are sliced lazily out of a read-only mapping, so only the current line is ever materialized. The file is
+    # opened here rather than on the first next(), so a missing file fails at the call; close() or a with block
+    # releases the mapping before the stream is exhausted. Text lines get universal newlines, like open(path, 'r')
+    def __init__(self, path: str, binary: bool = False):
+        self.binary = binary
+        self._pending: list[str] = []
+        self._file = open(path, 'rb')
+        try:
+            empty = os.fstat(self._file.fileno()).st_size == 0
+            self._data = None if empty else mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+
+    def __iter__(self) -> Self:
+        return self
+
+    def __next__(self) -> str | bytes:
+        if len(self._pending) > 0:
+            return self._pending.pop()
+        if self._data is None or self._data.closed or len(line := self._data.readline()) == 0:
+            self.close()
+            raise StopIteration
+        if self.binary:
+            return line
+        if b'\r' not in line:
+            return line.decode()
+        # a lone \r ends a line too, the pieces are handed out in reverse from _pending
+        pieces = line.decode().replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        lines = [it + '\n' for it in pieces[:-1]] + ([pieces[-1]] if len(pieces[-1]) > 0 else [])
+        self._pending = lines[:0:-1]
+        return lines[0]
+
+    def close(self):
+        if self._data is not None:
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+
+def stream_file_lines(path: str, binary: bool = False) -> LineStream:
+    return LineStream(path, binary)
+
+
+@dataclass(frozen=True, slots=True)
 class Vector:
     x: int
     y: int
 
+    def step(self, dx: int, dy: int) -> Self:
+        return Vector(self.x + dx, self.y + dy)
+
+    def pack(self, width: int) -> int:
+        return pack(self.x, self.y, width)
+
     def max_dim(self, second: Self) -> Self:
         return Vector(
             max(self.x, second.x),
@@ -36,6 +101,29 @@ class Vector:
         )
 
 
+def pack(x: int, y: int, width: int) -> int:
+    # row-major cell index, cheaper to hash and store than a Vector
+    return y * width + x
+
+
+@dataclass
+class VectorArray:
+    # columnar coordinates in two contiguous int64 buffers
+    xs: array = field(default_factory=lambda: array('q'))
+    ys: array = field(default_factory=lambda: array('q'))
+
+    @classmethod
+    def from_columns(cls, xs: Iterable[int], ys: Iterable[int]) -> Self:
+        return cls(array('q', xs), array('q', ys))
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    def __getitem__(self, index: int) -> Vector:
+        # allocates, bulk passes should read xs and ys directly
+        return Vector(self.xs[index], self.ys[index])
+
+
 @dataclass
 class Map[T]:
     width: int
@@ -74,4 +162,35 @@ def hexstr_to_int(input: str) -> int:
             value += ch - ord('A') + 10
         else:
             raise Exception(f"Invalid character in context of hex string: {i}")
-    return value
\ No newline at end of file
+    return value
+
+
+class VectorTestCase(unittest.TestCase):
+    def test_step(self):
+        self.assertEqual(Vector(2, 4), Vector(3, 3).step(-1, 1))
+        self.assertEqual(13, Vector(3, 2).pack(5))
+
+    def test_vector_array(self):
+        vectors = VectorArray.from_columns([1, 2], [3, 4])
+        self.assertEqual(2, len(vectors))
+        self.assertEqual(Vector(2, 4), vectors[1])
+
+
+class LineStreamTestCase(unittest.TestCase):
+    def test_newlines(self):
+        import tempfile
+        with tempfile.NamedTemporaryFile('wb', suffix='.txt', delete=False) as fp:
+            fp.write(b'a\r\nb\rc\n\rd\ne')
+        try:
+            with open(fp.name, 'r') as text:
+                self.assertListEqual(text.readlines(), list(load_file_lines(fp.name)))
+            self.assertListEqual([b'a\r\n', b'b\rc\n', b'\rd\n', b'e'], list(stream_file_lines(fp.name, binary=True)))
+            with load_file_lines(fp.name) as lines:
+                self.assertEqual('a\n', next(lines))
+            self.assertListEqual([], list(lines))
+        finally:
+            os.remove(fp.name)
+
+    def test_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            load_file_lines('does_not_exist.txt')
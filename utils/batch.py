@@ -0,0 +1,98 @@
+import argparse
+import glob
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Iterator, Optional
+
+from utils.bench import EXTRA_ARGS, ROOT, resolve_loader
+
+# set once per worker process by the pool initializer
+_function: Optional[Callable] = None
+_loader: Optional[Callable[[str], Any]] = None
+_extra_args: tuple = ()
+
+
+def resolve_task(task: str) -> tuple[Callable, Callable[[str], Any], tuple]:
+    module_name, function_name = task.rsplit('.', maxsplit=1)
+    module = importlib.import_module(module_name)
+    function = getattr(module, function_name)
+    return function, resolve_loader(module, function), EXTRA_ARGS.get(task, ())
+
+
+def _initialize(task: str):
+    global _function, _loader, _extra_args
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    _function, _loader, _extra_args = resolve_task(task)
+
+
+def _solve(path: str) -> dict[str, Any]:
+    begin = time.perf_counter()
+    try:
+        data = _loader(path)
+        parsed = time.perf_counter()
+        result = _function(data, *_extra_args)
+    except Exception as e:
+        return {'input': path, 'error': f"{type(e).__name__}: {e}"}
+    solved = time.perf_counter()
+    return {
+        'input': path,
+        'result': result if isinstance(result, (int, float, str)) else repr(result),
+        'parse': parsed - begin,
+        'solve': solved - parsed,
+    }
+
+
+def expand_inputs(sources: list[str]) -> list[str]:
+    ret = []
+    for source in sources:
+        if os.path.isdir(source):
+            ret += sorted(glob.glob(os.path.join(source, '*.txt')))
+        else:
+            ret += sorted(glob.glob(source))
+    return [os.path.abspath(it) for it in ret]
+
+
+def run_batch(task: str, paths: list[str], workers: Optional[int] = None) -> Iterator[dict[str, Any]]:
+    # results are yielded in completion order, not in the order of paths
+    with ProcessPoolExecutor(max_workers=workers, initializer=_initialize, initargs=(task,)) as executor:
+        futures = [executor.submit(_solve, path) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Solve many input files with one task entry point across a process pool")
+    parser.add_argument('task', help="qualified task function, e.g. Day19.task.task1")
+    parser.add_argument('inputs', nargs='+', help="input files, directories (all *.txt inside) or glob patterns")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    # fail fast on a bad task name before spinning up workers
+    resolve_task(args.task)
+
+    paths = expand_inputs(args.inputs)
+    begin = time.perf_counter()
+    failed = 0
+    for result in run_batch(args.task, paths, args.workers):
+        failed += 'error' in result
+        print(json.dumps(result), flush=True)
+    elapsed = time.perf_counter() - begin
+
+    print(json.dumps({
+        'task': args.task,
+        'files': len(paths),
+        'failed': failed,
+        'seconds': elapsed,
+        'files_per_second': len(paths) / elapsed if elapsed > 0 else None,
+    }), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+import argparse
+import fnmatch
+import importlib
+import inspect
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+import traceback
+from collections.abc import Iterator
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any, Callable, Optional, get_origin
+
+from utils import load_file, load_file_bytes, load_file_lines
+from utils import instrument
+from utils.generators import GENERATORS, generate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Task entry points taking more than the parsed input need their remaining arguments spelled out here.
+EXTRA_ARGS: dict[str, tuple] = {
+    'Day11.task.task': (1000000,),
+}
+
+
+@dataclass
+class TaskEntry:
+    name: str
+    module: ModuleType
+    function: Callable
+    input: str
+    extra_args: tuple = ()
+
+    @property
+    def loader(self) -> Callable[[str], Any]:
+        return resolve_loader(self.module, self.function)
+
+    def run(self, path: Optional[str] = None) -> tuple[Any, float, float]:
+        path = path if path is not None else self.input
+        loader = self.loader
+        begin = time.perf_counter()
+        data = loader(path)
+        parsed = time.perf_counter()
+        result = self.function(data, *self.extra_args)
+        solved = time.perf_counter()
+        return result, parsed - begin, solved - parsed
+
+
+@dataclass
+class Timings:
+    samples: list[float] = field(default_factory=list)
+
+    def summary(self) -> dict[str, float]:
+        ordered = sorted(self.samples)
+        if len(ordered) > 1:
+            percentiles = statistics.quantiles(ordered, n=100, method='inclusive')
+        else:
+            percentiles = ordered * 99
+        return {
+            'min': ordered[0],
+            'max': ordered[-1],
+            'mean': statistics.fmean(ordered),
+            'p50': percentiles[49],
+            'p90': percentiles[89],
+            'p99': percentiles[98],
+        }
+
+
+def resolve_loader(module: ModuleType, function: Callable) -> Callable[[str], Any]:
+    parameters = list(inspect.signature(function).parameters.values())
+    annotation = parameters[0].annotation if len(parameters) > 0 else str
+    if len(parameters) > 0 and parameters[0].name == 'path':
+        # streaming tasks open the file themselves and take its path unchanged
+        return os.fspath
+    if annotation is str:
+        return load_file
+    if annotation is bytes:
+        return load_file_bytes
+    if annotation is Iterator or get_origin(annotation) is Iterator:
+        return load_file_lines
+    if callable(load := getattr(module, 'load', None)):
+        return load
+    raise TypeError(f"Cannot derive an input loader for {function.__qualname__} (annotation: {annotation})")
+
+
+def resolve_input(directory: str, name: str) -> Optional[str]:
+    for candidate in [f"{name}_challenge.txt", "task_challenge.txt", f"{name}_input.txt"]:
+        path = os.path.join(directory, candidate)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def discover_days(root: str = ROOT) -> list[str]:
+    days = [it for it in os.listdir(root) if re.fullmatch(r'Day\d+', it) and os.path.isdir(os.path.join(root, it))]
+    return sorted(days, key=lambda it: int(it[3:]))
+
+
+def selected(names: list[str], patterns: Optional[list[str]]) -> bool:
+    if patterns is None:
+        return True
+    return any(fnmatch.fnmatch(name, pattern) for name in names for pattern in patterns)
+
+
+def discover(root: str = ROOT, patterns: Optional[list[str]] = None) -> Iterator[TaskEntry | tuple[str, str]]:
+    for day in discover_days(root):
+        directory = os.path.join(root, day)
+        for file in sorted(os.listdir(directory)):
+            if not re.fullmatch(r'task\w*\.py', file):
+                continue
+            module_name = f"{day}.{file[:-3]}"
+            if not selected([f"{module_name}.{it}" for it in ['task', 'task1', 'task2']], patterns):
+                continue
+            try:
+                module = importlib.import_module(module_name)
+            except Exception as e:
+                yield module_name, f"{type(e).__name__}: {e}"
+                continue
+
+            for name, function in inspect.getmembers(module, inspect.isfunction):
+                if not re.fullmatch(r'task\d*', name) or function.__module__ != module.__name__:
+                    continue
+                qualified = f"{module_name}.{name}"
+                if not selected([qualified], patterns):
+                    continue
+                if (input := resolve_input(directory, name)) is None:
+                    yield qualified, "No challenge input found"
+                    continue
+                yield TaskEntry(qualified, module, function, input, EXTRA_ARGS.get(qualified, ()))
+
+
+def benchmark(entry: TaskEntry, warmup: int, repeat: int, spans: bool = False) -> dict[str, Any]:
+    parse, solve, total = Timings(), Timings(), Timings()
+    result = None
+    with open(os.devnull, 'w') as sink, redirect_stdout(sink):
+        for _ in range(0, warmup):
+            entry.run()
+        instrument.RECORDER.reset()
+        for _ in range(0, repeat):
+            result, parse_time, solve_time = entry.run()
+            parse.samples.append(parse_time)
+            solve.samples.append(solve_time)
+            total.samples.append(parse_time + solve_time)
+
+    ret = {
+        'task': entry.name,
+        'input': os.path.relpath(entry.input, ROOT),
+        'result': result if isinstance(result, (int, float, str)) else repr(result),
+        'parse': parse.summary(),
+        'solve': solve.summary(),
+        'total': total.summary(),
+    }
+    if spans:
+        ret['spans'] = instrument.RECORDER.report()
+        ret['metrics'] = instrument.RECORDER.metrics()
+    return ret
+
+
+def scaling(entry: TaskEntry, sizes: list[int], repeat: int, seed: int = 0) -> list[dict[str, Any]]:
+    # best of repeat runs on synthetic inputs of growing size, a flat 'per_unit' column means linear scaling
+    day = entry.name.split('.')[0]
+    ret = []
+    with tempfile.TemporaryDirectory() as directory, open(os.devnull, 'w') as sink, redirect_stdout(sink):
+        for size in sizes:
+            path = os.path.join(directory, f"{day}_{size}.txt")
+            with open(path, 'w') as fp:
+                fp.write(generate(day, size, seed))
+            total = Timings()
+            for _ in range(0, repeat):
+                _, parse_time, solve_time = entry.run(path)
+                total.samples.append(parse_time + solve_time)
+            best = total.summary()['min']
+            ret.append({'size': size, 'total': best, 'per_unit': best / size})
+    return ret
+
+
+def run(
+        patterns: Optional[list[str]],
+        warmup: int,
+        repeat: int,
+        spans: bool = False,
+        collapsed: Optional[str] = None,
+        scale: Optional[list[int]] = None
+) -> dict[str, Any]:
+    results = []
+    stacks = []
+    for entry in discover(ROOT, patterns):
+        if not isinstance(entry, TaskEntry):
+            name, error = entry
+            results.append({'task': name, 'error': error})
+            continue
+        print(f"Benchmarking {entry.name}", file=sys.stderr)
+        try:
+            results.append(benchmark(entry, warmup, repeat, spans))
+            if scale is not None and entry.name.split('.')[0] in GENERATORS:
+                results[-1]['scaling'] = scaling(entry, scale, repeat)
+        except Exception as e:
+            traceback.print_exc(file=sys.stderr)
+            results.append({'task': entry.name, 'error': f"{type(e).__name__}: {e}"})
+        stacks.append(instrument.RECORDER.collapsed())
+
+    if collapsed is not None:
+        with open(collapsed, 'w') as fp:
+            fp.write(''.join(stacks))
+
+    return {
+        'python': sys.version,
+        'warmup': warmup,
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark every DayN task entry point against its challenge input")
+    parser.add_argument('patterns', nargs='*', help="fnmatch patterns of tasks to run, e.g. 'Day19.*' or 'Day11.task.task'")
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="write the JSON report to this file instead of stdout")
+    parser.add_argument('--spans', action='store_true', help="record instrumented spans (wall time, calls, tracemalloc peak) and metrics")
+    parser.add_argument('--collapsed', help="write collapsed span stacks for flamegraphs to this file")
+    parser.add_argument('--scale', type=lambda it: [int(size) for size in it.split(',')], metavar='SIZES',
+                        help="also time each task on generated inputs of these comma separated sizes, e.g. 1000,10000")
+    args = parser.parse_args(argv)
+
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+    if args.spans or args.collapsed is not None:
+        instrument.enable(memory=args.spans)
+
+    report = run(args.patterns or None, args.warmup, max(args.repeat, 1), args.spans, args.collapsed, args.scale)
+    if args.output is not None:
+        with open(args.output, 'w') as fp:
+            json.dump(report, fp, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
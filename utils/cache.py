@@ -0,0 +1,200 @@
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+import unittest
+import zlib
+from contextlib import contextmanager, suppress
+from functools import lru_cache
+from typing import Callable, Iterator, Optional
+
+CACHE_DIR = os.environ.get('AOC_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'aoc2023'))
+CACHE_LIMIT = int(os.environ.get('AOC_CACHE_LIMIT', 256 * 2**20))
+CACHE_ENABLED = os.environ.get('AOC_CACHE', '1') != '0'
+SUFFIX = '.pickle.z'
+
+
+@contextmanager
+def temporary_cache() -> Iterator[str]:
+    # points the default cache at a throwaway directory, so test runs leave nothing behind in the user's cache
+    global CACHE_DIR
+    previous = CACHE_DIR
+    with tempfile.TemporaryDirectory() as directory:
+        CACHE_DIR = directory
+        try:
+            yield directory
+        finally:
+            CACHE_DIR = previous
+
+
+def hash_file(path: str, digest=None):
+    digest = digest if digest is not None else hashlib.sha256()
+    with open(path, 'rb') as fp:
+        while len(chunk := fp.read(2**20)) > 0:
+            digest.update(chunk)
+    return digest
+
+
+@lru_cache
+def utils_digest() -> bytes:
+    # parsers lean on the shared loaders and tokenizers, so the whole utils package is part of every key
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.py'):
+            hash_file(os.path.join(directory, name), digest)
+    return digest.digest()
+
+
+def fingerprint(path: str, parser: Callable, args: tuple) -> str:
+    # the parser's own module is part of the key, so editing the parsing code invalidates its entries
+    digest = hash_file(path)
+    digest.update(utils_digest())
+    digest.update(f"{parser.__module__}.{parser.__qualname__}{args!r}".encode())
+    try:
+        source = inspect.getsourcefile(parser)
+    except TypeError:
+        source = None
+    if source is not None and os.path.isfile(source):
+        hash_file(source, digest)
+    return digest.hexdigest()
+
+
+def evict(cache_dir: str, limit: int):
+    entries = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith(SUFFIX):
+            continue
+        try:
+            stat = os.stat(path := os.path.join(cache_dir, name))
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def load_cached[T](path: str, parser: Callable[..., T], *args, cache_dir: Optional[str] = None, limit: Optional[int] = None) -> T:
+    if not CACHE_ENABLED:
+        return parser(path, *args)
+
+    cache_dir = cache_dir if cache_dir is not None else CACHE_DIR
+    limit = limit if limit is not None else CACHE_LIMIT
+    entry = os.path.join(cache_dir, fingerprint(path, parser, args) + SUFFIX)
+
+    try:
+        with open(entry, 'rb') as fp:
+            value = pickle.loads(zlib.decompress(fp.read()))
+        # entries are evicted by modification time, so a hit refreshes it
+        os.utime(entry)
+        return value
+    except FileNotFoundError:
+        pass
+    except Exception:
+        with suppress(OSError):
+            os.remove(entry)
+
+    value = parser(path, *args)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, temporary = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(zlib.compress(pickle.dumps(value, pickle.HIGHEST_PROTOCOL), 1))
+        os.replace(temporary, entry)
+    except Exception:
+        with suppress(OSError):
+            os.remove(temporary)
+        return value
+
+    evict(cache_dir, limit)
+    return value
+
+
+PARSER_SOURCE = """CALLS = []
+
+
+def parse(path):
+    CALLS.append(path)
+    with open(path) as fp:
+        return fp.read().split()
+"""
+
+
+class LoadCachedTestCase(unittest.TestCase):
+    def setUp(self):
+        global CACHE_ENABLED
+        self.enabled, CACHE_ENABLED = CACHE_ENABLED, True
+        self.directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.cache_dir = os.path.join(self.directory, 'cache')
+        self.input = self.write('input.txt', "a b c\n")
+        self.parser_file = self.write('cached_parser.py', PARSER_SOURCE)
+
+        import importlib.util
+        spec = importlib.util.spec_from_file_location('cached_parser', self.parser_file)
+        self.module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(self.module)
+
+    def tearDown(self):
+        global CACHE_ENABLED
+        CACHE_ENABLED = self.enabled
+
+    def write(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as fp:
+            fp.write(content)
+        return path
+
+    def entries(self) -> list[str]:
+        return [it for it in os.listdir(self.cache_dir) if it.endswith(SUFFIX)]
+
+    def test_hit(self):
+        self.assertEqual(['a', 'b', 'c'], load_cached(self.input, self.module.parse, cache_dir=self.cache_dir))
+        self.assertEqual(['a', 'b', 'c'], load_cached(self.input, self.module.parse, cache_dir=self.cache_dir))
+        self.assertEqual(1, len(self.module.CALLS))
+        self.assertEqual(1, len(self.entries()))
+
+    def test_invalidation(self):
+        load_cached(self.input, self.module.parse, cache_dir=self.cache_dir)
+        self.write('input.txt', "d e\n")
+        self.assertEqual(['d', 'e'], load_cached(self.input, self.module.parse, cache_dir=self.cache_dir))
+        self.write('cached_parser.py', PARSER_SOURCE + "# changed\n")
+        load_cached(self.input, self.module.parse, cache_dir=self.cache_dir)
+        self.assertEqual(3, len(self.module.CALLS))
+
+    def test_utils_source_in_key(self):
+        from unittest import mock
+        key = fingerprint(self.input, self.module.parse, ())
+        with mock.patch(f"{__name__}.utils_digest", return_value=b'edited utils'):
+            self.assertNotEqual(key, fingerprint(self.input, self.module.parse, ()))
+
+    def test_eviction(self):
+        load_cached(self.input, self.module.parse, cache_dir=self.cache_dir)
+        first = self.entries()
+        other = self.write('other.txt', "x y\n")
+        os.utime(os.path.join(self.cache_dir, first[0]), (0, 0))
+        # room for one entry only, the older one goes
+        load_cached(other, self.module.parse, cache_dir=self.cache_dir, limit=os.path.getsize(os.path.join(self.cache_dir, first[0])) + 8)
+        self.assertEqual(1, len(self.entries()))
+        self.assertNotEqual(first, self.entries())
+        load_cached(self.write('third.txt', "z\n"), self.module.parse, cache_dir=self.cache_dir, limit=0)
+        self.assertEqual([], self.entries())
+
+    def test_temporary_cache(self):
+        with temporary_cache() as directory:
+            load_cached(self.input, self.module.parse)
+            self.assertEqual(1, len(os.listdir(directory)))
+        self.assertFalse(os.path.exists(directory))
+
+
+if __name__ == '__main__':
+    unittest.main()
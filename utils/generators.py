@@ -0,0 +1,305 @@
+import argparse
+import sys
+from random import Random
+from typing import Callable, Optional
+
+DIGIT_WORDS = ['one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine']
+SYMBOLS = '*#+$/@=%&-'
+CARDS = '23456789TJQKA'
+ALMANAC_NAMES = ['seed', 'soil', 'fertilizer', 'water', 'light', 'temperature', 'humidity', 'location']
+KEYS = 'xmas'
+
+
+def day1(rng: Random, size: int, words: int = 1) -> str:
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    lines = []
+    for _ in range(0, size):
+        tokens = []
+        for _ in range(0, rng.randint(1, 8)):
+            match rng.randrange(0, 3 if words else 2):
+                case 0:
+                    tokens.append(str(rng.randint(1, 9)))
+                case 1:
+                    tokens.append(''.join(rng.choice(letters) for _ in range(0, rng.randint(1, 5))))
+                case 2:
+                    tokens.append(rng.choice(DIGIT_WORDS))
+        if not any(it.isdigit() for it in tokens):
+            tokens.insert(rng.randrange(0, len(tokens) + 1), str(rng.randint(1, 9)))
+        lines.append(''.join(tokens))
+    return '\n'.join(lines) + '\n'
+
+
+def day2(rng: Random, size: int) -> str:
+    lines = []
+    for number in range(1, size + 1):
+        draws = []
+        for _ in range(0, rng.randint(1, 6)):
+            colors = rng.sample(['red', 'green', 'blue'], rng.randint(1, 3))
+            draws.append(', '.join(f"{rng.randint(1, 20)} {color}" for color in colors))
+        lines.append(f"Game {number}: {'; '.join(draws)}")
+    return '\n'.join(lines) + '\n'
+
+
+def day3(rng: Random, size: int, width: int = 140) -> str:
+    lines = []
+    for _ in range(0, size):
+        row = ['.'] * width
+        ix = 0
+        while ix < width:
+            roll = rng.random()
+            if roll < 0.15:
+                digits = str(rng.randint(1, 999))
+                if ix + len(digits) <= width:
+                    row[ix:ix + len(digits)] = digits
+                ix += len(digits) + 1
+            elif roll < 0.20:
+                row[ix] = '*' if rng.random() < 0.4 else rng.choice(SYMBOLS)
+                ix += 1
+            else:
+                ix += 1
+        lines.append(''.join(row))
+    return '\n'.join(lines) + '\n'
+
+
+def day4(rng: Random, size: int, winning: int = 10, yours: int = 25) -> str:
+    id_width = len(str(size))
+    lines = []
+    for number in range(1, size + 1):
+        winning_numbers = rng.sample(range(1, 100), winning)
+        your_numbers = rng.sample(range(1, 100), yours)
+        lines.append(
+            f"Card {number:>{id_width}}: {' '.join(f'{it:2}' for it in winning_numbers)} | "
+            f"{' '.join(f'{it:2}' for it in your_numbers)}"
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def day5(rng: Random, size: int, ranges: int = 30, seeds: int = 10, universe: int = 2**32, overlapping: int = 0) -> str:
+    # by default every layer is a permutation of [0, universe); with overlapping set some blocks stay unmapped
+    # (identity gaps) and the rest land on random targets, so images may overlap each other and the gaps
+    names = ALMANAC_NAMES[:size + 1] + [f"layer{i}" for i in range(len(ALMANAC_NAMES), size + 1)]
+    seed_values = []
+    for _ in range(0, seeds):
+        begin = rng.randrange(0, universe - 1)
+        seed_values += [begin, rng.randint(1, min(universe - begin, universe // 16))]
+    lines = [f"seeds: {' '.join(str(it) for it in seed_values)}", ""]
+
+    for layer in range(0, size):
+        cuts = sorted(rng.sample(range(1, universe), ranges - 1))
+        blocks = [(begin, end - begin) for begin, end in zip([0] + cuts, cuts + [universe])]
+        shuffled = blocks.copy()
+        rng.shuffle(shuffled)
+        lines.append(f"{names[layer]}-to-{names[layer + 1]} map:")
+        target = 0
+        for source, length in shuffled:
+            if not overlapping:
+                lines.append(f"{target} {source} {length}")
+                target += length
+            elif rng.random() < 0.7:
+                lines.append(f"{rng.randrange(0, universe - length + 1)} {source} {length}")
+        lines.append("")
+    return '\n'.join(lines)
+
+
+def day6(rng: Random, size: int) -> str:
+    times = [rng.randint(7, 100) for _ in range(0, size)]
+    distances = [rng.randint(1, time * time // 4 - 1) for time in times]
+    return f"Time: {' '.join(f'{it:5}' for it in times)}\nDistance: {' '.join(f'{it:5}' for it in distances)}\n"
+
+
+def day7(rng: Random, size: int) -> str:
+    return ''.join(f"{''.join(rng.choice(CARDS) for _ in range(0, 5))} {rng.randint(1, 1000)}\n" for _ in range(0, size))
+
+
+def day8(rng: Random, size: int, steps: int = 300) -> str:
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    width = 3
+    while 24 * 26 ** (width - 1) < size:
+        width += 1
+
+    names = {'AAA', 'ZZZ'}
+    while len(names) < max(size, 2):
+        name = ''.join(rng.choice(letters) for _ in range(0, width))
+        if name[2] not in 'AZ':
+            names.add(name)
+    others = sorted(names - {'AAA', 'ZZZ'})
+    rng.shuffle(others)
+
+    # AAA walks a fixed chain into ZZZ regardless of the step sequence
+    chain = ['AAA'] + others[:len(others) // 2] + ['ZZZ']
+    nodes = {chain[i]: (chain[i + 1], chain[i + 1]) for i in range(0, len(chain) - 1)}
+    everything = chain + others[len(others) // 2:]
+    for name in everything:
+        if name not in nodes:
+            nodes[name] = (rng.choice(everything), rng.choice(everything))
+
+    lines = [''.join(rng.choice('LR') for _ in range(0, steps)), '']
+    lines += [f"{name} = ({left}, {right})" for name, (left, right) in nodes.items()]
+    return '\n'.join(lines) + '\n'
+
+
+def day9(rng: Random, size: int, readings: int = 21) -> str:
+    lines = []
+    for _ in range(0, size):
+        coefficients = [rng.randint(-9, 9) for _ in range(0, rng.randint(1, 5))]
+        values = [sum(c * x ** p for p, c in enumerate(coefficients)) for x in range(0, readings)]
+        lines.append(' '.join(str(it) for it in values))
+    return '\n'.join(lines) + '\n'
+
+
+def day10(rng: Random, size: int) -> str:
+    # rectangular loop with a ground ring around S, interior filled with unconnected junk
+    side = max(size, 4)
+    grid = [['.' for _ in range(0, side + 2)] for _ in range(0, side + 2)]
+    for i in range(2, side):
+        grid[1][i] = grid[side][i] = '-'
+        grid[i][1] = grid[i][side] = '|'
+    grid[1][1], grid[1][side], grid[side][1], grid[side][side] = 'S', '7', 'L', 'J'
+    for iy in range(3, side - 1):
+        for ix in range(3, side - 1):
+            grid[iy][ix] = rng.choice('.|-LJ7F')
+    return '\n'.join(''.join(row) for row in grid) + '\n'
+
+
+def day11(rng: Random, size: int, density: float = 0.02) -> str:
+    side = max(int((size / density) ** 0.5), 1)
+    while side * side < size:
+        side += 1
+    cells = rng.sample(range(0, side * side), size)
+    grid = [['.'] * side for _ in range(0, side)]
+    for cell in cells:
+        grid[cell // side][cell % side] = '#'
+    return '\n'.join(''.join(row) for row in grid) + '\n'
+
+
+def day12(rng: Random, size: int) -> str:
+    lines = []
+    for _ in range(0, size):
+        springs = [rng.choice('#.') for _ in range(0, rng.randint(4, 20))]
+        springs[rng.randrange(0, len(springs))] = '#'
+        groups = [len(it) for it in ''.join(springs).split('.') if len(it) > 0]
+        for i in range(0, len(springs)):
+            if rng.random() < 0.4:
+                springs[i] = '?'
+        lines.append(f"{''.join(springs)} {','.join(str(it) for it in groups)}")
+    return '\n'.join(lines) + '\n'
+
+
+def day13(rng: Random, size: int) -> str:
+    patterns = []
+    for _ in range(0, size):
+        width, height = rng.randint(5, 17), rng.randint(5, 17)
+        rows = [[rng.choice('.#') for _ in range(0, width)] for _ in range(0, height)]
+        if rng.random() < 0.5:
+            axis = rng.randint(1, width - 1)
+            for row in rows:
+                for i in range(0, min(axis, width - axis)):
+                    row[axis + i] = row[axis - i - 1]
+        else:
+            axis = rng.randint(1, height - 1)
+            for i in range(0, min(axis, height - axis)):
+                rows[axis + i] = rows[axis - i - 1].copy()
+        patterns.append('\n'.join(''.join(row) for row in rows))
+    return '\n\n'.join(patterns) + '\n'
+
+
+def day18(rng: Random, size: int, max_len: int = 12) -> str:
+    # skyline polygon: alternate vertical moves to a fresh height with moves to the right, then close
+    def instruction(direction: str, length: int) -> str:
+        code = {'R': 0, 'D': 1, 'L': 2, 'U': 3}[direction]
+        return f"{direction} {length} (#{rng.randrange(0, 16**5):05x}{code})"
+
+    lines = []
+    height, total = 0, 0
+    for _ in range(0, max(size, 1)):
+        target = rng.randint(1, max_len)
+        while target == height:
+            target = rng.randint(1, max_len)
+        lines.append(instruction('U' if target > height else 'D', abs(target - height)))
+        width = rng.randint(1, max_len)
+        lines.append(instruction('R', width))
+        height, total = target, total + width
+    lines.append(instruction('D', height))
+    lines.append(instruction('L', total))
+    return '\n'.join(lines) + '\n'
+
+
+def day19(rng: Random, size: int, parts: Optional[int] = None) -> str:
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    names = ['in']
+    taken = {'in'}
+    while len(names) < max(size, 1):
+        name = ''.join(rng.choice(letters) for _ in range(0, rng.randint(2, 4)))
+        if name not in taken:
+            taken.add(name)
+            names.append(name)
+
+    # workflows only point forward, so every part terminates in A or R
+    def target(index: int) -> str:
+        choices = names[index + 1:index + 8] + ['A', 'R']
+        return rng.choice(choices)
+
+    lines = []
+    for index, name in enumerate(names):
+        steps = [
+            f"{rng.choice(KEYS)}{rng.choice('<>')}{rng.randint(1, 4000)}:{target(index)}"
+            for _ in range(0, rng.randint(1, 4))
+        ]
+        steps.append(target(index))
+        lines.append(f"{name}{{{','.join(steps)}}}")
+    lines.append('')
+    for _ in range(0, parts if parts is not None else max(size, 1)):
+        lines.append(f"{{{','.join(f'{key}={rng.randint(1, 4000)}' for key in KEYS)}}}")
+    return '\n'.join(lines) + '\n'
+
+
+GENERATORS: dict[str, Callable[..., str]] = {
+    'Day1': day1,
+    'Day2': day2,
+    'Day3': day3,
+    'Day4': day4,
+    'Day5': day5,
+    'Day6': day6,
+    'Day7': day7,
+    'Day8': day8,
+    'Day9': day9,
+    'Day10': day10,
+    'Day11': day11,
+    'Day12': day12,
+    'Day13': day13,
+    'Day18': day18,
+    'Day19': day19,
+}
+
+
+def generate(day: str, size: int, seed: int = 0, **options) -> str:
+    if day not in GENERATORS:
+        raise KeyError(f"No input generator for {day}, known days: {', '.join(GENERATORS)}")
+    return GENERATORS[day](Random(seed), size, **options)
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic puzzle input of the requested size")
+    parser.add_argument('day', choices=list(GENERATORS))
+    parser.add_argument('size', type=int, help="lines, games, layers, nodes, galaxies, ... depending on the day")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--option', action='append', default=[], metavar='KEY=VALUE',
+                        help="extra integer parameter of the generator, e.g. ranges=1000 or overlapping=1 for Day5")
+    parser.add_argument('--output', help="write to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    options = {}
+    for it in args.option:
+        key, value = it.split('=', maxsplit=1)
+        options[key] = int(value)
+
+    data = generate(args.day, args.size, args.seed, **options)
+    if args.output is not None:
+        with open(args.output, 'w') as fp:
+            fp.write(data)
+    else:
+        sys.stdout.write(data)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+import unittest
+from dataclasses import dataclass
+from typing import Iterable, Self
+
+from utils import Vector
+
+
+@dataclass
+class ByteGrid:
+    # uint8 cells stored row-major in a single buffer; whole-row and whole-grid passes run as slice operations
+    width: int
+    height: int
+    data: bytearray
+    fallback: int = 0
+
+    @classmethod
+    def filled(cls, width: int, height: int, value: int, fallback: int | None = None) -> Self:
+        return cls(width, height, bytearray([value]) * (width * height), value if fallback is None else fallback)
+
+    @classmethod
+    def from_text(cls, input: str | bytes, fallback: int = ord('.')) -> Self:
+        if isinstance(input, str):
+            input = input.encode()
+        lines = input.splitlines()
+        width = len(lines[0]) if len(lines) > 0 else 0
+        if any(len(line) != width for line in lines):
+            raise ValueError("All rows of a grid must have the same width")
+        return cls(width, len(lines), bytearray(b''.join(lines)), fallback)
+
+    def index(self, x: int, y: int) -> int:
+        return y * self.width + x
+
+    def contains(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def get(self, x: int, y: int) -> int:
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.data[y * self.width + x]
+        return self.fallback
+
+    def set(self, x: int, y: int, value: int):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.data[y * self.width + x] = value
+        else:
+            raise IndexError()
+
+    def __getitem__(self, key: Vector) -> int:
+        return self.get(key.x, key.y)
+
+    def __setitem__(self, key: Vector, value: int):
+        self.set(key.x, key.y, value)
+
+    def row(self, y: int) -> memoryview:
+        return memoryview(self.data)[y * self.width:(y + 1) * self.width]
+
+    def rows(self) -> Iterable[memoryview]:
+        view = memoryview(self.data)
+        for y in range(0, self.height):
+            yield view[y * self.width:(y + 1) * self.width]
+
+    def find(self, value: int, y: int, begin: int = 0) -> int:
+        # column of the first cell holding value in row y at or after begin, width if there is none
+        inx = self.data.find(value, y * self.width + begin, (y + 1) * self.width)
+        return self.width if inx == -1 else inx - y * self.width
+
+    def fill(self, value: int, begin: Vector | None = None, end: Vector | None = None):
+        # fills the half-open rectangle [begin, end), the whole grid by default
+        if begin is None and end is None:
+            self.data[:] = bytearray([value]) * len(self.data)
+            return
+        begin = begin if begin is not None else Vector(0, 0)
+        end = end if end is not None else Vector(self.width, self.height)
+        for y in range(max(begin.y, 0), min(end.y, self.height)):
+            self.fill_row(y, begin.x, end.x, value)
+
+    def fill_row(self, y: int, begin: int, end: int, value: int):
+        begin, end = max(begin, 0), min(end, self.width)
+        if begin < end:
+            offset = y * self.width
+            self.data[offset + begin:offset + end] = bytes([value]) * (end - begin)
+
+    def fill_column(self, x: int, begin: int, end: int, value: int):
+        begin, end = max(begin, 0), min(end, self.height)
+        if begin < end:
+            self.data[begin * self.width + x:(end - 1) * self.width + x + 1:self.width] = bytes([value]) * (end - begin)
+
+    def count(self, value: int) -> int:
+        return self.data.count(value)
+
+    def translated(self, table: bytes, fallback: int = 0) -> Self:
+        # every cell replaced by its entry in a 256 byte table, in a single pass
+        return ByteGrid(self.width, self.height, bytearray(self.data.translate(table)), fallback)
+
+    def mask(self, values: Iterable[int]) -> Self:
+        table = bytearray(256)
+        for value in values:
+            table[value] = 1
+        return self.translated(table)
+
+    def shifted(self, dx: int, dy: int, fill: int = 0) -> Self:
+        # cell (x, y) of the result holds cell (x - dx, y - dy) of this grid
+        ret = ByteGrid.filled(self.width, self.height, fill, self.fallback)
+        if abs(dx) >= self.width or abs(dy) >= self.height:
+            return ret
+        source_begin, target_begin, length = max(-dx, 0), max(dx, 0), self.width - abs(dx)
+        for y in range(max(dy, 0), min(self.height + dy, self.height)):
+            source = (y - dy) * self.width
+            target = y * self.width
+            ret.data[target + target_begin:target + target_begin + length] = \
+                self.data[source + source_begin:source + source_begin + length]
+        return ret
+
+    def _combine(self, other: Self, operator) -> Self:
+        if self.width != other.width or self.height != other.height:
+            raise ValueError("Grids must have the same dimensions")
+        size = len(self.data)
+        value = operator(int.from_bytes(self.data, 'little'), int.from_bytes(other.data, 'little'))
+        return ByteGrid(self.width, self.height, bytearray(value.to_bytes(size, 'little')), self.fallback)
+
+    def __or__(self, other: Self) -> Self:
+        return self._combine(other, int.__or__)
+
+    def __and__(self, other: Self) -> Self:
+        return self._combine(other, int.__and__)
+
+    def dilated(self) -> Self:
+        # 3x3 neighborhood of every non-zero cell of a 0/1 mask
+        horizontal = self | self.shifted(1, 0) | self.shifted(-1, 0)
+        return horizontal | horizontal.shifted(0, 1) | horizontal.shifted(0, -1)
+
+    def text(self) -> str:
+        return '\n'.join(bytes(row).decode() for row in self.rows())
+
+
+class ByteGridTestCase(unittest.TestCase):
+    def test_from_text(self):
+        grid = ByteGrid.from_text("ab\ncd\n")
+        self.assertEqual(2, grid.width)
+        self.assertEqual(2, grid.height)
+        self.assertEqual(ord('c'), grid[Vector(0, 1)])
+        self.assertEqual(ord('.'), grid[Vector(5, 1)])
+        self.assertEqual(b'cd', bytes(grid.row(1)))
+
+    def test_fill(self):
+        grid = ByteGrid.filled(4, 3, ord('.'))
+        grid.fill_row(0, 1, 3, ord('#'))
+        grid.fill_column(3, 0, 3, ord('|'))
+        grid.fill(ord('x'), Vector(0, 2), Vector(2, 3))
+        self.assertEqual(".##|\n...|\nxx.|", grid.text())
+        self.assertEqual(5, grid.count(ord('.')))
+        self.assertEqual(3, grid.find(ord('|'), 1))
+        self.assertEqual(4, grid.find(ord('#'), 1))
+
+    def test_shifted(self):
+        grid = ByteGrid.from_text("ab\ncd")
+        self.assertEqual("..\n.a", grid.shifted(1, 1, ord('.')).text())
+        self.assertEqual("d.\n..", grid.shifted(-1, -1, ord('.')).text())
+
+    def test_dilated(self):
+        grid = ByteGrid.from_text("....\n....\n...*\n....").mask([ord('*')])
+        self.assertEqual(
+            bytes([0, 0, 0, 0, 0, 0, 1, 1, 0, 0, 1, 1, 0, 0, 1, 1]),
+            bytes(grid.dilated().data)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,211 @@
+import cProfile
+import functools
+import os
+import pstats
+import time
+import tracemalloc
+import unittest
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Callable, ContextManager, Optional
+
+
+@dataclass
+class SpanStats:
+    calls: int = 0
+    total: float = 0.0
+    peak_memory: int = 0
+
+
+@dataclass
+class Frame:
+    name: str
+    path: str
+    begin: float
+    child_time: float = 0.0
+    memory_begin: int = 0
+    memory_peak: int = 0
+
+
+@dataclass
+class Recorder:
+    enabled: bool = False
+    memory: bool = False
+    spans: dict[str, SpanStats] = field(default_factory=dict)
+    stacks: dict[str, float] = field(default_factory=dict)
+    frames: list[Frame] = field(default_factory=list)
+    values: dict[str, list[float]] = field(default_factory=dict)
+
+    def enter(self, name: str):
+        path = f"{self.frames[-1].path};{name}" if len(self.frames) > 0 else name
+        frame = Frame(name, path, 0.0)
+        if self.memory and tracemalloc.is_tracing():
+            frame.memory_begin = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self.frames.append(frame)
+        frame.begin = time.perf_counter()
+
+    def exit(self):
+        end = time.perf_counter()
+        frame = self.frames.pop()
+        elapsed = end - frame.begin
+
+        stats = self.spans.setdefault(frame.name, SpanStats())
+        stats.calls += 1
+        stats.total += elapsed
+        self.stacks[frame.path] = self.stacks.get(frame.path, 0.0) + elapsed - frame.child_time
+
+        peak = 0
+        if self.memory and tracemalloc.is_tracing():
+            # reset_peak() in nested spans hides their peak from us, so children report it upwards
+            peak = max(tracemalloc.get_traced_memory()[1], frame.memory_peak)
+            stats.peak_memory = max(stats.peak_memory, peak - frame.memory_begin)
+
+        if len(self.frames) > 0:
+            parent = self.frames[-1]
+            parent.child_time += elapsed
+            parent.memory_peak = max(parent.memory_peak, peak)
+
+    def reset(self):
+        self.spans.clear()
+        self.stacks.clear()
+        self.frames.clear()
+        self.values.clear()
+
+    def report(self) -> dict[str, dict[str, Any]]:
+        return {
+            name: {'calls': it.calls, 'total': it.total, 'peak_memory': it.peak_memory}
+            for name, it in self.spans.items()
+        }
+
+    def metrics(self) -> dict[str, list[float]]:
+        return {name: list(values) for name, values in self.values.items()}
+
+    def collapsed(self) -> str:
+        # flamegraph.pl / speedscope "collapsed stacks" with self time in microseconds
+        return ''.join(f"{path} {round(value * 1e6)}\n" for path, value in sorted(self.stacks.items()))
+
+
+RECORDER = Recorder(enabled=os.environ.get('AOC_PROFILE', '0') != '0')
+
+
+class Span:
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        RECORDER.enter(self.name)
+        return self
+
+    def __exit__(self, *args):
+        RECORDER.exit()
+        return False
+
+
+_DISABLED = nullcontext()
+
+
+def span(name: str) -> ContextManager:
+    if not RECORDER.enabled:
+        return _DISABLED
+    return Span(name)
+
+
+def record(name: str, value: float):
+    # appends a sample to a named series, e.g. a working set size after every step of an algorithm
+    if RECORDER.enabled:
+        RECORDER.values.setdefault(name, []).append(value)
+
+
+def instrument(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    def decorator(function: Callable) -> Callable:
+        label = name if name is not None else f"{function.__module__}.{function.__qualname__}"
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not RECORDER.enabled:
+                return function(*args, **kwargs)
+            RECORDER.enter(label)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                RECORDER.exit()
+
+        return wrapper
+
+    return decorator
+
+
+def enable(memory: bool = False):
+    RECORDER.enabled = True
+    RECORDER.memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    RECORDER.enabled = False
+    if RECORDER.memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    RECORDER.memory = False
+
+
+def profile_call(function: Callable, *args, output: Optional[str] = None, **kwargs) -> Any:
+    # runs function under cProfile, dumping pstats to output or printing the top entries
+    profiler = cProfile.Profile()
+    ret = profiler.runcall(function, *args, **kwargs)
+    if output is not None:
+        profiler.dump_stats(output)
+    else:
+        pstats.Stats(profiler).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(20)
+    return ret
+
+
+class RecorderTestCase(unittest.TestCase):
+    def setUp(self):
+        RECORDER.reset()
+        enable(memory=True)
+
+    def tearDown(self):
+        disable()
+        RECORDER.reset()
+
+    def test_nested_spans(self):
+        @instrument('outer')
+        def outer():
+            with span('inner'):
+                data = [0] * 100000
+            with span('inner'):
+                pass
+            return len(data)
+
+        self.assertEqual(100000, outer())
+        report = RECORDER.report()
+        self.assertEqual(1, report['outer']['calls'])
+        self.assertEqual(2, report['inner']['calls'])
+        self.assertGreaterEqual(report['outer']['total'], report['inner']['total'])
+        self.assertGreater(report['inner']['peak_memory'], 100000 * 8 - 1)
+        self.assertGreaterEqual(report['outer']['peak_memory'], report['inner']['peak_memory'])
+        self.assertEqual(['outer', 'outer;inner'], [it.split(' ')[0] for it in RECORDER.collapsed().splitlines()])
+
+    def test_record(self):
+        record('size', 3)
+        record('size', 5)
+        self.assertEqual({'size': [3, 5]}, RECORDER.metrics())
+
+    def test_disabled(self):
+        disable()
+        record('size', 3)
+
+        @instrument()
+        def function():
+            with span('inner'):
+                return 5
+
+        self.assertEqual(5, function())
+        self.assertEqual({}, RECORDER.report())
+        self.assertEqual({}, RECORDER.metrics())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import operator
+import os
+import sys
+import unittest
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import reduce as fold
+from itertools import chain
+from typing import Callable, Iterator, Optional
+
+type Reducer[R] = Callable[[R, R], R]
+
+
+def free_threaded() -> bool:
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def split_ranges(path: str, parts: int) -> list[tuple[int, int]]:
+    # byte ranges of roughly equal size, each starting at the beginning of a line
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, 'rb') as fp:
+        for i in range(1, parts):
+            offset = max(size * i // parts, bounds[-1])
+            if offset >= size:
+                break
+            if offset == 0:
+                continue
+            fp.seek(offset - 1)
+            fp.readline()
+            bounds.append(fp.tell())
+    bounds.append(size)
+    return [(begin, end) for begin, end in zip(bounds, bounds[1:]) if end > begin]
+
+
+def read_lines_chunked(path: str, chunk_size: int = 2**20, begin: int = 0, end: Optional[int] = None) -> Iterator[str]:
+    # reads fixed size chunks, carrying the unfinished tail of each chunk over into the next one
+    carry = b''
+    with open(path, 'rb') as fp:
+        fp.seek(begin)
+        remaining = (end if end is not None else os.fstat(fp.fileno()).st_size) - begin
+        while remaining > 0 and len(chunk := fp.read(min(chunk_size, remaining))) > 0:
+            remaining -= len(chunk)
+            lines = chunk.split(b'\n')
+            lines[0] = carry + lines[0]
+            carry = lines.pop()
+            for line in lines:
+                yield line.decode()
+    if len(carry) > 0:
+        yield carry.decode()
+
+
+def reduce_range[R](
+        path: str,
+        begin: int,
+        end: int,
+        line_function: Callable[[str], R],
+        reduce: Reducer[R],
+        chunk_size: int = 2**20
+) -> list[R]:
+    # the reduction of a range without any seed, empty when the range holds no line; at most one chunk is in memory
+    lines = (line.rstrip('\r') for line in read_lines_chunked(path, chunk_size, begin, end))
+    values = map(line_function, (line for line in lines if len(line) > 0))
+    sentinel = object()
+    if (first := next(values, sentinel)) is sentinel:
+        return []
+    return [fold(reduce, values, first)]
+
+
+def map_reduce_lines[R](
+        path: str,
+        line_function: Callable[[str], R],
+        reduce: Reducer[R] = operator.add,
+        initial: R = 0,
+        workers: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        chunk_size: int = 2**20
+) -> R:
+    # line_function and reduce have to be module level functions so process workers can unpickle them;
+    # initial is folded in exactly once, so the result does not depend on the number of ranges
+    workers = workers if workers is not None else os.cpu_count() or 1
+    ranges = split_ranges(path, workers * 4)
+    if workers == 1 or len(ranges) <= 1:
+        return fold(reduce, reduce_range(path, 0, os.path.getsize(path), line_function, reduce, chunk_size), initial)
+
+    def run(pool: Executor) -> R:
+        futures = [pool.submit(reduce_range, path, begin, end, line_function, reduce, chunk_size) for begin, end in ranges]
+        return fold(reduce, chain.from_iterable(it.result() for it in futures), initial)
+
+    if executor is not None:
+        return run(executor)
+    pool_type = ThreadPoolExecutor if free_threaded() else ProcessPoolExecutor
+    with pool_type(max_workers=workers) as pool:
+        return run(pool)
+
+
+class SplitRangesTestCase(unittest.TestCase):
+    def test_line_aligned(self):
+        import tempfile
+        with tempfile.NamedTemporaryFile('wb', suffix='.txt', delete=False) as fp:
+            fp.write(b''.join(f"{i}\n".encode() for i in range(0, 1000)))
+        try:
+            ranges = split_ranges(fp.name, 7)
+            self.assertEqual(0, ranges[0][0])
+            self.assertEqual(os.path.getsize(fp.name), ranges[-1][1])
+            for (_, end), (begin, _) in zip(ranges, ranges[1:]):
+                self.assertEqual(end, begin)
+            self.assertEqual(sum(range(0, 1000)), map_reduce_lines(fp.name, int, workers=3))
+            self.assertEqual(sum(range(0, 1000)), map_reduce_lines(fp.name, int, workers=1))
+            self.assertEqual(sum(range(0, 1000)) + 100, map_reduce_lines(fp.name, int, initial=100, workers=3))
+            self.assertEqual(sum(range(0, 1000)) + 100, map_reduce_lines(fp.name, int, initial=100, workers=1))
+            self.assertEqual(sum(range(0, 1000)), map_reduce_lines(fp.name, int, workers=1, chunk_size=7))
+        finally:
+            os.remove(fp.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,23 @@
+import unittest
+from functools import lru_cache
+
+
+@lru_cache
+def _separator_table(separators: bytes) -> bytes:
+    return bytes.maketrans(separators, b' ' * len(separators))
+
+
+def fields(data: bytes, separators: bytes) -> list[bytes]:
+    # separators become whitespace in a single translate pass, so one split() yields every field
+    return data.translate(_separator_table(separators)).split()
+
+
+class FieldsTestCase(unittest.TestCase):
+    def test_fields(self):
+        self.assertListEqual([b'AAA', b'BBB', b'CCC'], fields(b"AAA = (BBB, CCC)\n", b'=(),'))
+        self.assertListEqual([b'x', b'787', b'm', b'2655'], fields(b"{x=787,m=2655}", b'{}=,'))
+        self.assertListEqual([b'3', b'blue', b'4', b'red'], fields(b" 3 blue, 4 red", b','))
+
+
+if __name__ == '__main__':
+    unittest.main()